@@ -1,12 +1,89 @@
-from flask import Flask, request, jsonify
-import MetaTrader5 as mt5
-import hashlib
+from flask import Flask, request, jsonify, Response, g, has_request_context, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import numpy as np
+import gzip
 import hmac
 import json
+import os
 import time
+import math
+import bisect
+import threading
+import queue
+import sys
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from array import array
+from collections import OrderedDict, deque, namedtuple
 from functools import wraps
+from async_logging import get_logger
+from metrics import MetricsRegistry
+from signing import RAW_SIGNATURE_VERSION, ReplayGuard, canonical_signature, raw_signature
+
+# GOLD_API_FAKE_MT5=1 runs against the simulated terminal in fake_mt5.py (benchmarks, non-Windows)
+if os.environ.get('GOLD_API_FAKE_MT5'):
+    from fake_mt5 import FakeMetaTrader5
+    MetaTrader5 = FakeMetaTrader5.from_env()
+else:
+    import MetaTrader5
+
+# Optional faster encoders; responses fall back to standard-library JSON without them
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+def _msgpack_default(obj):
+    # numpy scalars and anything else msgpack has no type for
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+class NegotiatingJSONProvider(DefaultJSONProvider):
+    """jsonify() that answers in MessagePack to clients that accept it
+    
+    JSON bodies are encoded with orjson when it is installed.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and kwargs.get('indent') is None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS |
+                                    orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        negotiated = msgpack is not None and has_request_context()
+        if negotiated and request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE:
+            # Same argument handling as jsonify()
+            if args and kwargs:
+                raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+            if not args:
+                obj = kwargs
+            elif len(args) == 1:
+                obj = args[0]
+            else:
+                obj = list(args)
+            response = self._app.response_class(msgpack.packb(obj, default=_msgpack_default), mimetype=MSGPACK_MIMETYPE)
+        else:
+            response = super().response(*args, **kwargs)
+        
+        # The body depends on Accept whenever MessagePack could have been chosen
+        if negotiated:
+            response.vary.add('Accept')
+        return response
 
 app = Flask(__name__)
+app.json = NegotiatingJSONProvider(app)
+logger = get_logger('gold_api')
 
 # Security configuration
 API_KEY = "12345"
@@ -16,8 +93,156 @@ MAX_REQUEST_AGE = 60000  # 60 seconds in milliseconds
 # Global variable to store the detected gold symbol
 GOLD_SYMBOL = None
 
+# Pending MT5 calls allowed before new ones are rejected
+MT5_QUEUE_SIZE = 256
+
+# Longest a request waits for its MT5 call to be run and return (seconds)
+MT5_CALL_TIMEOUT = 10
+
+metrics = MetricsRegistry()
+metrics.describe('gold_api_request_duration_seconds', 'histogram', 'Time spent handling an API request')
+metrics.describe('gold_api_request_errors_total', 'counter', 'API responses with a 4xx or 5xx status')
+metrics.describe('gold_api_requests_in_flight', 'gauge', 'API requests currently being handled')
+metrics.describe('gold_api_mt5_call_duration_seconds', 'histogram', 'Time an MT5 function took on the executor thread')
+metrics.describe('gold_api_mt5_call_errors_total', 'counter', 'MT5 calls that raised, were rejected or timed out')
+metrics.describe('gold_api_mt5_calls_in_flight', 'gauge', 'MT5 calls queued or running')
+metrics.describe('gold_api_mt5_queue_depth', 'gauge', 'MT5 calls waiting in the executor queue')
+
+# Calls waited for to the end once running: giving up on a running order_send
+# would report failure for an order that may still fill
+MT5_UNBOUNDED_CALLS = ('order_send',)
+
+class MT5Busy(Exception):
+    """The MT5 call queue is full"""
+
+class MT5Timeout(Exception):
+    """An MT5 call did not complete within MT5_CALL_TIMEOUT"""
+
+class MT5Executor:
+    """Runs every MT5 call on one dedicated thread through a bounded queue
+    
+    The MetaTrader5 API is not thread-safe, so request handlers, tick
+    pollers and background jobs all hand their calls to this thread.
+    """
+    
+    def __init__(self, queue_size=MT5_QUEUE_SIZE, timeout=MT5_CALL_TIMEOUT):
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mt5-executor", daemon=True)
+                    self._thread.start()
+    
+    def call(self, fn, *args, **kwargs):
+        """Run fn on the executor thread and return its result"""
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put_nowait((future, fn, args, kwargs))
+        except queue.Full:
+            raise MT5Busy('MT5 request queue is full')
+        
+        name = getattr(fn, '__name__', fn)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A call that never started can be dropped: MT5 has not seen it
+            if future.cancel():
+                raise MT5Timeout(f'MT5 call {name} timed out')
+            if name in MT5_UNBOUNDED_CALLS:
+                logger.warning("MT5 call %s still running after %ss; waiting for its result", name, self.timeout)
+                return future.result()
+            raise MT5Timeout(f'MT5 call {name} timed out')
+    
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+    
+    def _run(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            # Skip calls whose caller already gave up
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            metrics.observe('gold_api_mt5_call_duration_seconds', time.perf_counter() - start,
+                            function=getattr(fn, '__name__', 'unknown'))
+
+class MT5Proxy:
+    """Stands in for the MetaTrader5 module, sending its functions through an executor
+    
+    on_failure, if set, is called after a call times out or raises, so the
+    connection can be re-checked before the next request relies on it.
+    """
+    
+    def __init__(self, module, executor, on_failure=None):
+        self._module = module
+        self._executor = executor
+        self.on_failure = on_failure
+    
+    def __getattr__(self, name):
+        target = getattr(self._module, name)
+        if not callable(target):
+            # Constants are cached as they are
+            setattr(self, name, target)
+            return target
+        
+        executor = self._executor
+        def failed(reason):
+            metrics.inc('gold_api_mt5_call_errors_total', function=name, reason=reason)
+            if self.on_failure is not None:
+                self.on_failure()
+        
+        def call(*args, **kwargs):
+            metrics.gauge_add('gold_api_mt5_calls_in_flight', 1, function=name)
+            try:
+                return executor.call(target, *args, **kwargs)
+            except MT5Busy:
+                metrics.inc('gold_api_mt5_call_errors_total', function=name, reason='busy')
+                raise
+            except MT5Timeout:
+                failed('timeout')
+                raise
+            except Exception:
+                failed('exception')
+                raise
+            finally:
+                metrics.gauge_add('gold_api_mt5_calls_in_flight', -1, function=name)
+        call.__name__ = name
+        
+        # Cache so the next lookup skips __getattr__
+        setattr(self, name, call)
+        return call
+
+mt5_executor = MT5Executor()
+mt5 = MT5Proxy(MetaTrader5, mt5_executor)
+metrics.gauge_callback('gold_api_mt5_queue_depth', lambda: mt5_executor.queue_depth)
+
+# Signatures remembered for replay detection within MAX_REQUEST_AGE
+REPLAY_CACHE_SIZE = 10000
+
+replay_guard = ReplayGuard(MAX_REQUEST_AGE, REPLAY_CACHE_SIZE)
+
 def verify_signature(f):
-    """Decorator to verify API request signatures"""
+    """Decorator to verify API request signatures
+    
+    Clients sending X-Signature-Version: 2 sign the raw body bytes, so the
+    body is parsed once and never re-serialized. Other requests use the
+    original sorted-key JSON scheme. Either way a signature is only
+    accepted once.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         api_key = request.headers.get('X-API-Key')
@@ -30,30 +255,253 @@ def verify_signature(f):
             return jsonify({'error': 'Invalid API key'}), 401
         
         # Verify signature
-        data = request.get_json() or {}
-        expected_signature = hmac.new(
-            API_SECRET.encode('utf-8'),
-            json.dumps(data, sort_keys=True).encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        if request.headers.get('X-Signature-Version') == RAW_SIGNATURE_VERSION:
+            expected_signature = raw_signature(API_SECRET, request.get_data(cache=True))
+            if not hmac.compare_digest(signature, expected_signature):
+                return jsonify({'error': 'Invalid signature'}), 401
+            data = request.get_json(silent=True) or {}
+        else:
+            data = request.get_json() or {}
+            expected_signature = canonical_signature(API_SECRET, data)
+            if not hmac.compare_digest(signature, expected_signature):
+                return jsonify({'error': 'Invalid signature'}), 401
         
-        if not hmac.compare_digest(signature, expected_signature):
-            return jsonify({'error': 'Invalid signature'}), 401
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
         
         # Check timestamp to prevent replay attacks
         timestamp = data.get('timestamp', 0)
+        if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+            return jsonify({'error': 'timestamp must be a number of milliseconds'}), 400
         current_time = int(time.time() * 1000)
         if abs(current_time - timestamp) > MAX_REQUEST_AGE:
             return jsonify({'error': 'Request too old'}), 401
         
+        if not replay_guard.check(signature, timestamp, current_time):
+            return jsonify({'error': 'Replayed request'}), 401
+        
         return f(*args, **kwargs)
     return decorated_function
 
+# Connection health is re-checked at most this often (seconds)
+MT5_HEALTH_CHECK_INTERVAL = 5
+
+# Delay between reconnect attempts doubles from MIN up to MAX (seconds)
+MT5_RECONNECT_BACKOFF_MIN = 1
+MT5_RECONNECT_BACKOFF_MAX = 30
+
+class MT5ConnectionManager:
+    """Initializes MT5 once, tracks its health and reconnects lazily with backoff
+    
+    Takes the MT5 module as a parameter so a fake MetaTrader5 can be used
+    in its place.
+    """
+    
+    def __init__(self, mt5_module, health_check_interval=MT5_HEALTH_CHECK_INTERVAL,
+                 backoff_min=MT5_RECONNECT_BACKOFF_MIN, backoff_max=MT5_RECONNECT_BACKOFF_MAX,
+                 clock=time.monotonic):
+        self.mt5 = mt5_module
+        self.health_check_interval = health_check_interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.connected = False
+        self.connected_since = None
+        self.last_error = None
+        self.reconnect_attempts = 0
+        self._backoff = backoff_min
+        self._next_attempt = 0
+        self._last_check = 0
+        self._lock = threading.Lock()
+    
+    def ensure_connected(self):
+        """True if MT5 is usable, connecting or reconnecting if needed"""
+        # Hot path: healthy and checked recently, no lock and no MT5 call
+        if self.connected and self.clock() - self._last_check < self.health_check_interval:
+            return True
+        
+        with self._lock:
+            now = self.clock()
+            if self.connected:
+                if now - self._last_check < self.health_check_interval:
+                    return True
+                if self.mt5.terminal_info() is not None:
+                    self._last_check = now
+                    return True
+                self._disconnected(f'Terminal not responding: {self.mt5.last_error()}')
+            
+            if now < self._next_attempt:
+                return False
+            return self._connect(now)
+    
+    def mark_unhealthy(self):
+        """Force a health check on the next ensure_connected() call"""
+        self._last_check = float('-inf')
+    
+    def _connect(self, now):
+        self.reconnect_attempts += 1
+        if self.mt5.initialize():
+            self.connected = True
+            self.connected_since = time.time()
+            self.last_error = None
+            self.reconnect_attempts = 0
+            self._backoff = self.backoff_min
+            self._last_check = now
+            logger.info("MT5 connection established")
+            return True
+        
+        self.last_error = str(self.mt5.last_error())
+        self._next_attempt = now + self._backoff
+        logger.warning("MT5 initialization failed: %s (retry in %ss)", self.last_error, self._backoff)
+        self._backoff = min(self._backoff * 2, self.backoff_max)
+        return False
+    
+    def _disconnected(self, reason):
+        logger.warning("MT5 connection lost: %s", reason)
+        self.connected = False
+        self.connected_since = None
+        self.last_error = reason
+        self._next_attempt = 0  # first reconnect attempt is immediate
+    
+    def state(self):
+        """Connection state for /api/status"""
+        if self.connected:
+            state = 'connected'
+        elif self.clock() < self._next_attempt:
+            state = 'backoff'
+        else:
+            state = 'disconnected'
+        
+        return {
+            'state': state,
+            'connected_since': self.connected_since,
+            'last_error': self.last_error,
+            'reconnect_attempts': self.reconnect_attempts,
+            'next_retry_in': round(max(0, self._next_attempt - self.clock()), 1) if not self.connected else 0
+        }
+
+mt5_connection = MT5ConnectionManager(mt5)
+# A terminal that stops answering is health-checked on the next request
+mt5.on_failure = mt5_connection.mark_unhealthy
+
+# Keywords used to recognise gold-like symbols in the broker's symbol list
+GOLD_KEYWORDS = ['XAU', 'GOLD', 'AU', 'GC']
+
+# How long the broker symbol list is trusted before it is reloaded (seconds)
+SYMBOL_CATALOG_TTL = 300
+
+class SymbolCatalog:
+    """Indexed, TTL-cached view of the broker's symbol list"""
+    
+    def __init__(self, ttl=SYMBOL_CATALOG_TTL, keywords=GOLD_KEYWORDS):
+        self.ttl = ttl
+        self.keywords = list(keywords)
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._names = []
+        self._name_set = frozenset()
+        self._by_upper = {}
+        self._sorted_upper = []
+        self._gold_candidates = []
+        self._gold_like = []
+    
+    def _build(self, symbols):
+        """Build name and prefix indexes and the gold lists from a symbols_get() result"""
+        names = [s.name for s in symbols]
+        by_upper = {}
+        gold_candidates = []
+        gold_like = []
+        
+        for name in names:
+            name_upper = name.upper()
+            by_upper.setdefault(name_upper, name)
+            
+            matched = [keyword for keyword in self.keywords if keyword in name_upper]
+            if matched:
+                gold_like.append(name)
+                # Same rule detect_gold_symbol() has always used for its keyword search
+                if 'USD' in name_upper or 'GOLD' in matched:
+                    gold_candidates.append(name)
+        
+        self._names = names
+        self._name_set = frozenset(names)
+        self._by_upper = by_upper
+        self._sorted_upper = sorted(by_upper)
+        self._gold_candidates = gold_candidates
+        self._gold_like = gold_like
+    
+    def refresh(self):
+        """Reload the symbol list from MT5 and rebuild the indexes"""
+        symbols = mt5.symbols_get()
+        with self._lock:
+            if not symbols:
+                self._build([])
+                self._loaded_at = None
+                return False
+            self._build(symbols)
+            self._loaded_at = time.time()
+            logger.info("Symbol catalog loaded: %d symbols", len(self._names))
+            return True
+    
+    def invalidate(self):
+        """Force the next lookup to reload the symbol list"""
+        with self._lock:
+            self._loaded_at = None
+    
+    def ensure_loaded(self):
+        """Reload the catalog if it is empty or older than the TTL"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.time() - loaded_at > self.ttl:
+            return self.refresh()
+        return True
+    
+    @property
+    def age(self):
+        """Seconds since the catalog was last loaded, or None"""
+        loaded_at = self._loaded_at
+        return None if loaded_at is None else time.time() - loaded_at
+    
+    def __len__(self):
+        return len(self._names)
+    
+    def __contains__(self, name):
+        return name in self._name_set
+    
+    def names(self, limit=None):
+        """Symbol names in broker order"""
+        return self._names[:limit] if limit is not None else list(self._names)
+    
+    def with_prefix(self, prefix, limit=None):
+        """Symbols whose name starts with prefix (case-insensitive)"""
+        prefix = prefix.upper()
+        sorted_upper = self._sorted_upper
+        start = bisect.bisect_left(sorted_upper, prefix)
+        matches = []
+        # Walk from start in place; slicing would copy the rest of the index
+        for i in range(start, len(sorted_upper)):
+            name_upper = sorted_upper[i]
+            if not name_upper.startswith(prefix):
+                break
+            matches.append(self._by_upper[name_upper])
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
+    
+    def gold_candidates(self):
+        """Gold keyword matches quoted in USD, or containing GOLD"""
+        return list(self._gold_candidates)
+    
+    def gold_like(self):
+        """Every symbol containing a gold keyword"""
+        return list(self._gold_like)
+
+symbol_catalog = SymbolCatalog()
+
 def detect_gold_symbol():
     """Auto-detect the gold symbol used by the broker"""
     global GOLD_SYMBOL
     
-    print("Detecting gold symbol...")
+    logger.info("Detecting gold symbol...")
     
     # Common gold symbol variations used by different brokers
     possible_symbols = [
@@ -64,37 +512,26 @@ def detect_gold_symbol():
     
     # Get all available symbols
     try:
-        all_symbols = mt5.symbols_get()
-        if not all_symbols:
-            print("No symbols available from broker")
+        if not symbol_catalog.ensure_loaded():
+            logger.warning("No symbols available from broker")
             return None
         
-        available_symbol_names = [s.name for s in all_symbols]
-        print(f"Total symbols available: {len(available_symbol_names)}")
+        logger.info("Total symbols available: %d", len(symbol_catalog))
         
         # Method 1: Try exact matches first
         for symbol in possible_symbols:
-            if symbol in available_symbol_names:
+            if symbol in symbol_catalog:
                 if mt5.symbol_select(symbol, True):
                     tick = mt5.symbol_info_tick(symbol)
                     if tick is not None:
-                        print(f"✓ Found gold symbol: {symbol}")
+                        logger.info("Found gold symbol: %s", symbol)
                         GOLD_SYMBOL = symbol
                         return symbol
         
         # Method 2: Search for symbols containing gold-related keywords
-        gold_keywords = ['XAU', 'GOLD', 'AU', 'GC']
-        found_gold_symbols = []
-        
-        for symbol_obj in all_symbols:
-            symbol_name = symbol_obj.name.upper()
-            for keyword in gold_keywords:
-                if keyword in symbol_name:
-                    if 'USD' in symbol_name or keyword == 'GOLD':
-                        found_gold_symbols.append(symbol_obj.name)
-                        break
+        found_gold_symbols = symbol_catalog.gold_candidates()
         
-        print(f"Found potential gold symbols: {found_gold_symbols}")
+        logger.info("Found potential gold symbols: %s", found_gold_symbols)
         
         # Test each found symbol
         for symbol in found_gold_symbols:
@@ -105,28 +542,28 @@ def detect_gold_symbol():
                 if tick is not None and symbol_info is not None:
                     avg_price = (tick.bid + tick.ask) / 2
                     if 1000 <= avg_price <= 5000:  # Reasonable gold price range
-                        print(f"✓ Auto-detected gold symbol: {symbol} (Price: ${avg_price:.2f})")
+                        logger.info("Auto-detected gold symbol: %s (Price: $%.2f)", symbol, avg_price)
                         GOLD_SYMBOL = symbol
                         return symbol
         
-        print("\nCould not auto-detect gold symbol. Available symbols containing potential gold keywords:")
+        logger.warning("Could not auto-detect gold symbol. Available symbols containing potential gold keywords:")
         for symbol in found_gold_symbols[:10]:
             try:
                 if mt5.symbol_select(symbol, True):
                     tick = mt5.symbol_info_tick(symbol)
                     if tick:
                         avg_price = (tick.bid + tick.ask) / 2
-                        print(f"  {symbol}: ${avg_price:.2f}")
+                        logger.info("  %s: $%.2f", symbol, avg_price)
             except:
                 continue
         
         if found_gold_symbols:
-            print(f"\nTo manually set gold symbol, use /api/set_gold_symbol endpoint with one of: {found_gold_symbols}")
+            logger.warning("To manually set gold symbol, use /api/set_gold_symbol endpoint with one of: %s", found_gold_symbols)
         
         return None
         
     except Exception as e:
-        print(f"Error detecting gold symbol: {str(e)}")
+        logger.error("Error detecting gold symbol: %s", e)
         return None
 
 def get_gold_symbol():
@@ -138,16 +575,466 @@ def get_gold_symbol():
     
     return GOLD_SYMBOL
 
+# How often an active symbol's tick is polled from MT5 (seconds)
+TICK_POLL_INTERVAL = 0.1
+
+# Pollers nobody has read from for this long are stopped (seconds)
+TICK_POLLER_IDLE_TIMEOUT = 60
+
+# How long a request waits for a new poller's first tick (seconds)
+TICK_FIRST_WAIT = 2.0
+
+# Most symbols polled at once; each poller is a thread calling MT5 every interval
+MAX_TICK_POLLERS = 32
+
+class TickSnapshot(namedtuple('TickSnapshot', 'symbol bid ask time time_msc seq received')):
+    """Immutable copy of the latest tick seen for a symbol"""
+    __slots__ = ()
+    
+    @property
+    def age(self):
+        """Seconds since this tick was first seen by the poller"""
+        return time.time() - self.received
+    
+    @property
+    def price(self):
+        return (self.bid + self.ask) / 2
+
+# Ticks kept per symbol in the history ring buffer
+TICK_HISTORY_SIZE = 4096
+
+# Number of most recent ticks covered by SMA, VWAP, spread and volatility
+INDICATOR_WINDOW = 200
+
+# Period of the exponential moving average (in ticks)
+EMA_PERIOD = 50
+
+# Window sums are recomputed exactly after this many ticks to cancel float drift
+INDICATOR_RESYNC_INTERVAL = 10000
+
+class TickHistory:
+    """Fixed-size array ring buffer of ticks with incrementally updated indicators
+    
+    Each append adds the new tick to running window sums and subtracts the
+    tick leaving the window, so every indicator costs O(1) per tick. VWAP
+    weights by tick volume; brokers that report zero volume get equal
+    weights, which makes it match the SMA.
+    """
+    
+    def __init__(self, capacity=TICK_HISTORY_SIZE, window=INDICATOR_WINDOW, ema_period=EMA_PERIOD):
+        if not 0 < window <= capacity:
+            raise ValueError('window must be between 1 and capacity')
+        self.capacity = capacity
+        self.window = window
+        self._alpha = 2.0 / (ema_period + 1)
+        self._time_msc = array('q', bytes(8 * capacity))
+        self._mid = array('d', bytes(8 * capacity))
+        self._spread = array('d', bytes(8 * capacity))
+        self._volume = array('d', bytes(8 * capacity))
+        self._log_return = array('d', bytes(8 * capacity))
+        self._head = 0
+        self._count = 0
+        self._ema = None
+        self._since_resync = 0
+        self._reset_sums()
+        self._lock = threading.Lock()
+    
+    def _reset_sums(self):
+        self._sum_mid = 0.0
+        self._sum_price_volume = 0.0
+        self._sum_volume = 0.0
+        self._sum_spread = 0.0
+        self._sum_spread_sq = 0.0
+        self._sum_return = 0.0
+        self._sum_return_sq = 0.0
+    
+    def _add(self, i, sign):
+        mid, volume, spread, ret = self._mid[i], self._volume[i], self._spread[i], self._log_return[i]
+        self._sum_mid += sign * mid
+        self._sum_price_volume += sign * mid * volume
+        self._sum_volume += sign * volume
+        self._sum_spread += sign * spread
+        self._sum_spread_sq += sign * spread * spread
+        self._sum_return += sign * ret
+        self._sum_return_sq += sign * ret * ret
+    
+    def append(self, time_msc, bid, ask, volume=0):
+        mid = (bid + ask) / 2
+        with self._lock:
+            i = self._head
+            capacity = self.capacity
+            
+            if self._count:
+                previous = self._mid[(i - 1) % capacity]
+                log_return = math.log(mid / previous) if previous > 0 and mid > 0 else 0.0
+            else:
+                log_return = 0.0
+            
+            # The tick written `window` appends ago drops out of the window
+            if self._count >= self.window:
+                self._add((i - self.window) % capacity, -1)
+            
+            self._time_msc[i] = time_msc
+            self._mid[i] = mid
+            self._spread[i] = ask - bid
+            self._volume[i] = volume if volume > 0 else 1.0
+            self._log_return[i] = log_return
+            self._add(i, 1)
+            
+            self._ema = mid if self._ema is None else self._ema + self._alpha * (mid - self._ema)
+            self._head = (i + 1) % capacity
+            self._count = min(self._count + 1, capacity)
+            
+            self._since_resync += 1
+            if self._since_resync >= INDICATOR_RESYNC_INTERVAL:
+                self._resync()
+    
+    def _resync(self):
+        self._reset_sums()
+        for k in range(1, min(self._count, self.window) + 1):
+            self._add((self._head - k) % self.capacity, 1)
+        self._since_resync = 0
+    
+    def __len__(self):
+        return self._count
+    
+    def indicators(self):
+        """Current indicator values over the last `window` ticks"""
+        with self._lock:
+            n = min(self._count, self.window)
+            if n == 0:
+                return {'count': 0, 'window': self.window}
+            
+            spread_mean = self._sum_spread / n
+            return_mean = self._sum_return / n
+            return {
+                'count': self._count,
+                'window': self.window,
+                'last_price': self._mid[(self._head - 1) % self.capacity],
+                'sma': self._sum_mid / n,
+                'ema': self._ema,
+                'vwap': self._sum_price_volume / self._sum_volume if self._sum_volume else None,
+                'spread_mean': spread_mean,
+                'spread_std': math.sqrt(max(self._sum_spread_sq / n - spread_mean * spread_mean, 0.0)),
+                'volatility': math.sqrt(max(self._sum_return_sq / n - return_mean * return_mean, 0.0))
+            }
+    
+    def recent(self, points):
+        """Last `points` ticks as (time_msc list, mid list), oldest first"""
+        with self._lock:
+            points = min(points, self._count)
+            start = (self._head - points) % self.capacity
+            indexes = [(start + k) % self.capacity for k in range(points)]
+            return [self._time_msc[i] for i in indexes], [self._mid[i] for i in indexes]
+
+class TickHistoryStore:
+    """TickHistory per symbol; outlives idle pollers so history is kept"""
+    
+    def __init__(self):
+        self._histories = {}
+        self._lock = threading.Lock()
+    
+    def get(self, symbol):
+        history = self._histories.get(symbol)
+        if history is None:
+            with self._lock:
+                history = self._histories.setdefault(symbol, TickHistory())
+        return history
+
+tick_histories = TickHistoryStore()
+
+class TickPoller(threading.Thread):
+    """Background thread keeping the latest tick of one symbol in memory"""
+    
+    def __init__(self, symbol, registry, interval=TICK_POLL_INTERVAL):
+        super().__init__(name=f"tick-poller-{symbol}", daemon=True)
+        self.symbol = symbol
+        self.interval = interval
+        self.error = None
+        self.last_read = time.time()
+        self._registry = registry
+        self.history = tick_histories.get(symbol)
+        self._latest = None
+        self._seq = 0
+        self._polled = False
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    @property
+    def latest(self):
+        """Latest tick without waiting, or None"""
+        return self._latest
+    
+    def latest_tick(self, timeout=TICK_FIRST_WAIT):
+        """Latest tick, waiting up to timeout for the first poll to finish"""
+        self.last_read = time.time()
+        if self._polled:
+            return self._latest
+        with self._cond:
+            self._cond.wait_for(lambda: self._polled, timeout)
+            return self._latest
+    
+    def wait_for_update(self, after_seq, timeout):
+        """Latest tick once its sequence passes after_seq, or None on timeout"""
+        def has_update():
+            latest = self._latest
+            # A sequence ahead of ours comes from a poller that has since been replaced
+            return latest is not None and (latest.seq > after_seq or after_seq > self._seq)
+        
+        self.last_read = time.time()
+        with self._cond:
+            if self._cond.wait_for(has_update, timeout):
+                return self._latest
+            return None
+    
+    def _publish(self, tick=None, error=None):
+        with self._cond:
+            if tick is not None:
+                latest = self._latest
+                if latest is None or (tick.bid, tick.ask, tick.time_msc) != (latest.bid, latest.ask, latest.time_msc):
+                    self._seq += 1
+                    self._latest = TickSnapshot(self.symbol, tick.bid, tick.ask, tick.time,
+                                                tick.time_msc, self._seq, time.time())
+                    self.history.append(tick.time_msc, tick.bid, tick.ask, tick.volume)
+            else:
+                # Never serve a price the terminal can no longer confirm
+                self._latest = None
+            self.error = error
+            self._polled = True
+            self._cond.notify_all()
+    
+    def _poll_once(self):
+        tick = mt5.symbol_info_tick(self.symbol)
+        if tick is None:
+            self._publish(error=f'No price data available for {self.symbol} (market may be closed)')
+        else:
+            self._publish(tick=tick)
+    
+    def run(self):
+        selected = False
+        while not self._stop_event.is_set():
+            if self._registry._retire_if_idle(self):
+                break
+            try:
+                if not mt5_connection.ensure_connected():
+                    self._publish(error='MT5 not connected')
+                    selected = False
+                    self._stop_event.wait(1.0)
+                    continue
+                if not selected:
+                    selected = mt5.symbol_select(self.symbol, True)
+                    if not selected:
+                        self._publish(error=f'Symbol {self.symbol} not found or not available')
+                        self._stop_event.wait(1.0)
+                        continue
+                self._poll_once()
+            except Exception as e:
+                logger.error("Tick poller error for %s: %s", self.symbol, e)
+                self._publish(error=str(e))
+            self._stop_event.wait(self.interval)
+
+class TickPollersFull(Exception):
+    """No poller can be started for another symbol right now"""
+
+class TickPollerRegistry:
+    """One TickPoller per active symbol, started on first use
+    
+    Callers check the symbol exists before asking for its poller; at most
+    max_pollers symbols are polled at once.
+    """
+    
+    def __init__(self, idle_timeout=TICK_POLLER_IDLE_TIMEOUT, max_pollers=MAX_TICK_POLLERS):
+        self.idle_timeout = idle_timeout
+        self.max_pollers = max_pollers
+        self._pollers = {}
+        self._lock = threading.Lock()
+    
+    def get(self, symbol):
+        """Running poller for symbol, starting one if needed
+        
+        Raises TickPollersFull if max_pollers other symbols are being polled.
+        """
+        with self._lock:
+            poller = self._pollers.get(symbol)
+            if poller is None or not poller.is_alive():
+                if poller is None and len(self._pollers) >= self.max_pollers:
+                    raise TickPollersFull(f'Too many symbols polled at once (max {self.max_pollers})')
+                poller = TickPoller(symbol, self)
+                self._pollers[symbol] = poller
+                poller.start()
+            poller.last_read = time.time()
+            return poller
+    
+    def peek(self, symbol):
+        """Cached tick for symbol if a poller is already running, else None"""
+        poller = self._pollers.get(symbol)
+        return poller.latest if poller is not None else None
+    
+    def _retire_if_idle(self, poller):
+        """Called from the poller thread; unregisters it if nobody reads it"""
+        if time.time() - poller.last_read < self.idle_timeout:
+            return False
+        with self._lock:
+            if time.time() - poller.last_read < self.idle_timeout:
+                return False
+            if self._pollers.get(poller.symbol) is poller:
+                del self._pollers[poller.symbol]
+            logger.info("Stopped idle tick poller for %s", poller.symbol)
+            return True
+
+tick_pollers = TickPollerRegistry()
+
+# Failed loads are shared with callers for this long before MT5 is tried again (seconds)
+SNAPSHOT_ERROR_TTL = 1.0
+
+class SharedSnapshots:
+    """Results of an MT5 read shared by every request within interval seconds
+    
+    Single-flight: when a snapshot is stale, one caller reloads it while
+    concurrent callers for the same key wait for that load and reuse it, so
+    MT5 sees the same call rate however many clients are polling. A load
+    that raises is shared the same way for up to SNAPSHOT_ERROR_TTL, so a
+    hung terminal is not retried once per waiting request. Snapshot values
+    are never modified after loading.
+    """
+    
+    def __init__(self, load, interval):
+        self._load = load
+        self.interval = interval
+        self.loads = 0
+        self._snapshots = {}  # key -> (value, error, expires_at)
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+    
+    def get(self, *key):
+        """Snapshot for key (the load function's arguments), reloading it if stale
+        
+        Re-raises the exception of a recent failed load.
+        """
+        entry = self._snapshots.get(key)
+        if entry is None or time.monotonic() >= entry[2]:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                entry = self._snapshots.get(key)
+                if entry is None or time.monotonic() >= entry[2]:
+                    entry = self._reload(key)
+        
+        value, error, _ = entry
+        if error is not None:
+            raise error
+        return value
+    
+    def _reload(self, key):
+        generation = self._generation
+        started = time.monotonic()
+        try:
+            entry = (self._load(*key), None, started + self.interval)
+        except Exception as e:
+            entry = (None, e, started + min(self.interval, SNAPSHOT_ERROR_TTL))
+        self.loads += 1
+        # A load that overlapped invalidate() may predate the change; don't keep it
+        if generation == self._generation:
+            self._snapshots[key] = entry
+        return entry
+    
+    def discard(self, *key):
+        """Forget the snapshot for key; the next get() reads from MT5 again"""
+        with self._lock:
+            self._snapshots.pop(key, None)
+            self._key_locks.pop(key, None)
+    
+    def invalidate(self):
+        """Make the next get() of every key read from MT5 again"""
+        with self._lock:
+            self._generation += 1
+            self._snapshots = {}
+
+# Contract specs (trade mode, volume limits) are re-read after this long (seconds)
+SYMBOL_SPEC_TTL = 60
+
+SymbolSpec = namedtuple('SymbolSpec', 'symbol trade_mode volume_min volume_max volume_step digits loaded_at')
+
+class SymbolSpecCache:
+    """Per-symbol contract specifications with a TTL, loaded single-flight"""
+    
+    def __init__(self, ttl=SYMBOL_SPEC_TTL):
+        self.ttl = ttl
+        self._specs = SharedSnapshots(self._load, ttl)
+    
+    def get(self, symbol):
+        """Cached spec for symbol, loading it from MT5 if missing or expired
+        
+        Returns None if the symbol cannot be selected or has no symbol info.
+        """
+        spec = self._specs.get(symbol)
+        if spec is None:
+            # Unknown names are not kept, so made-up symbols cannot grow the cache
+            self._specs.discard(symbol)
+        return spec
+    
+    def _load(self, symbol):
+        if not mt5.symbol_select(symbol, True):
+            return None
+        
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        
+        return SymbolSpec(symbol, info.trade_mode, info.volume_min, info.volume_max,
+                          info.volume_step, info.digits, time.time())
+    
+    def invalidate(self, symbol=None):
+        """Drop the cached spec for symbol, or every spec"""
+        if symbol is None:
+            self._specs.invalidate()
+        else:
+            self._specs.discard(symbol)
+
+symbol_specs = SymbolSpecCache()
+
+# Account, positions and fallback quotes are read from MT5 at most once per interval (seconds)
+ACCOUNT_SNAPSHOT_INTERVAL = 1.0
+POSITIONS_SNAPSHOT_INTERVAL = 1.0
+QUOTE_SNAPSHOT_INTERVAL = 0.25
+
+quote_snapshots = SharedSnapshots(lambda symbol: mt5.symbol_info_tick(symbol), QUOTE_SNAPSHOT_INTERVAL)
+
+# Price stream: comment line sent when no tick arrives for this long (seconds)
+STREAM_HEARTBEAT_INTERVAL = 15
+
+# Streams are closed after this long so clients re-authenticate (seconds)
+STREAM_MAX_DURATION = 300
+
+# Each open stream holds a server thread; past this many, new streams get a
+# 503 and those clients poll instead
+MAX_PRICE_STREAMS = 32
+
+price_stream_slots = threading.BoundedSemaphore(MAX_PRICE_STREAMS)
+
+def format_sse(data, event=None, event_id=None):
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
 def initialize_mt5():
     """Initialize MT5 connection"""
-    print("Attempting MT5 initialization...")
-    if not mt5.initialize():
-        print(f"MT5 initialization failed: {mt5.last_error()}")
+    logger.info("Attempting MT5 initialization...")
+    if not mt5_connection.ensure_connected():
         return False
     
     account_info = mt5.account_info()
     if account_info is not None:
-        print(f"MT5 logged in - Account: {account_info.login}, Server: {account_info.server}, Balance: ${account_info.balance}")
+        logger.info("MT5 logged in - Account: %s, Server: %s, Balance: $%s", account_info.login, account_info.server, account_info.balance)
         return True
     
     # Replace with your MT5 credentials
@@ -156,25 +1043,85 @@ def initialize_mt5():
     MT5_SERVER = None  # Set your server
     
     if MT5_LOGIN and MT5_PASSWORD and MT5_SERVER:
-        print("Attempting MT5 login...")
+        logger.info("Attempting MT5 login...")
         if mt5.login(MT5_LOGIN, MT5_PASSWORD, MT5_SERVER):
-            print("MT5 login successful")
+            logger.info("MT5 login successful")
             return True
         else:
-            print(f"MT5 login failed: {mt5.last_error()}")
+            logger.error("MT5 login failed: %s", mt5.last_error())
             return False
     
-    print("MT5 not logged in - please login manually in MT5 terminal")
+    logger.warning("MT5 not logged in - please login manually in MT5 terminal")
     return False
 
+@app.before_request
+def start_request_metrics():
+    """Count the request as in flight and start its latency timer"""
+    g.metrics_endpoint = request.endpoint or 'unmatched'
+    g.metrics_start = time.perf_counter()
+    metrics.gauge_add('gold_api_requests_in_flight', 1, endpoint=g.metrics_endpoint)
+
+@app.after_request
+def record_response_metrics(response):
+    """Record latency and errors once the response is built
+    
+    Streamed responses are left out of the latency histogram; their
+    duration is the life of the stream, not the cost of the request.
+    """
+    endpoint = g.get('metrics_endpoint')
+    if endpoint is None:
+        return response
+    
+    if not response.is_streamed:
+        metrics.observe('gold_api_request_duration_seconds', time.perf_counter() - g.metrics_start, endpoint=endpoint)
+    if response.status_code >= 400:
+        metrics.inc('gold_api_request_errors_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.after_request
+def add_server_time(response):
+    """Stamp every response with the server clock so clients can correct their timestamps"""
+    response.headers['X-Server-Time'] = str(int(time.time() * 1000))
+    return response
+
+# Response bodies smaller than this are not worth compressing (bytes)
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+
+@app.after_request
+def compress_response(response):
+    """Gzip large bodies for clients that send Accept-Encoding: gzip"""
+    if (response.is_streamed or response.direct_passthrough or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or 'gzip' not in request.accept_encodings):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    """Release the in-flight slot, also after unhandled errors and once a stream closes"""
+    endpoint = g.pop('metrics_endpoint', None)
+    if endpoint is not None:
+        metrics.gauge_add('gold_api_requests_in_flight', -1, endpoint=endpoint)
+
 @app.route('/api/detect_gold_symbol', methods=['POST'])
 @verify_signature
 def detect_gold_symbol_endpoint():
     """Endpoint to manually trigger gold symbol detection"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
+        # An explicit re-detection should also pick up symbols the broker added
+        symbol_catalog.invalidate()
+        symbol_specs.invalidate()
         detected_symbol = detect_gold_symbol()
         if detected_symbol:
             return jsonify({
@@ -183,14 +1130,8 @@ def detect_gold_symbol_endpoint():
                 'message': f'Gold symbol auto-detected as: {detected_symbol}'
             }), 200
         else:
-            symbols = mt5.symbols_get()
-            gold_like_symbols = []
-            
-            if symbols:
-                for s in symbols:
-                    name_upper = s.name.upper()
-                    if any(keyword in name_upper for keyword in ['XAU', 'GOLD', 'AU', 'GC']):
-                        gold_like_symbols.append(s.name)
+            symbol_catalog.ensure_loaded()
+            gold_like_symbols = symbol_catalog.gold_like()
             
             return jsonify({
                 'success': False,
@@ -200,7 +1141,7 @@ def detect_gold_symbol_endpoint():
             }), 200
     
     except Exception as e:
-        print(f"Error in detect_gold_symbol_endpoint: {str(e)}")
+        logger.error("Error in detect_gold_symbol_endpoint: %s", e)
         return jsonify({'error': f'Detection failed: {str(e)}'}), 500
 
 @app.route('/api/list_symbols', methods=['POST'])
@@ -208,242 +1149,1123 @@ def detect_gold_symbol_endpoint():
 def list_symbols():
     """Get list of available symbols from MT5"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        symbols = mt5.symbols_get()
-        if not symbols:
+        data = request.get_json() or {}
+        if data.get('refresh'):
+            symbol_catalog.invalidate()
+        
+        if not symbol_catalog.ensure_loaded():
             return jsonify({'error': 'No symbols available'}), 500
         
         if GOLD_SYMBOL is None:
             detect_gold_symbol()
         
-        gold_symbols = [s.name for s in symbols if any(keyword in s.name.upper() for keyword in ['XAU', 'GOLD', 'AU', 'GC'])]
-        sample_symbols = [s.name for s in symbols][:10]
+        gold_symbols = symbol_catalog.gold_like()
+        sample_symbols = symbol_catalog.names(limit=10)
         
-        print(f"Available gold-related symbols: {gold_symbols}")
-        print(f"Sample symbols: {sample_symbols}")
-        print(f"Detected gold symbol: {GOLD_SYMBOL}")
+        logger.debug("Available gold-related symbols: %s", gold_symbols)
+        logger.debug("Sample symbols: %s", sample_symbols)
+        logger.debug("Detected gold symbol: %s", GOLD_SYMBOL)
         
-        return jsonify({
+        response = {
             'success': True,
             'detected_gold_symbol': GOLD_SYMBOL,
             'gold_related_symbols': gold_symbols,
             'sample_symbols': sample_symbols,
-            'total_symbols': len(symbols)
-        }), 200
+            'total_symbols': len(symbol_catalog),
+            'catalog_age': round(symbol_catalog.age or 0, 1)
+        }
+        
+        prefix = data.get('prefix')
+        if prefix and not isinstance(prefix, str):
+            return jsonify({'error': 'prefix must be a string'}), 400
+        if prefix:
+            response['prefix_matches'] = symbol_catalog.with_prefix(prefix, limit=100)
+        
+        return jsonify(response), 200
         
     except Exception as e:
-        print(f"Error fetching symbols: {str(e)}")
+        logger.error("Error fetching symbols: %s", e)
         return jsonify({'error': f'Failed to fetch symbols: {str(e)}'}), 500
 
+# Poll intervals suggested to clients in 'next_poll_ms' (milliseconds). Nothing
+# below the default: faster polling is the client's call, around order entry
+POLL_HINT_DEFAULT_MS = 3000
+POLL_HINT_QUIET_MS = 15000
+POLL_HINT_CLOSED_MS = 30000
+
+def suggest_poll_interval(tick_age=None):
+    """Next poll interval to suggest, from how long the quote has been unchanged"""
+    if tick_age is None:
+        hint = POLL_HINT_CLOSED_MS
+    elif tick_age < 60:
+        hint = POLL_HINT_DEFAULT_MS
+    else:
+        hint = POLL_HINT_QUIET_MS
+    
+    # Ask clients to back off while MT5 calls are queueing up
+    if mt5_executor.queue_depth > MT5_QUEUE_SIZE // 2:
+        hint *= 2
+    return hint
+
+def _requested_symbol(data):
+    """data['symbol'] (or the gold symbol) as (symbol, None), or (None, (payload, status))"""
+    symbol = data.get('symbol')
+    if not symbol:
+        symbol = get_gold_symbol()
+        if not symbol:
+            return None, ({'error': 'No symbol provided and could not auto-detect gold symbol'}, 400)
+    elif not isinstance(symbol, str):
+        return None, ({'error': 'symbol must be a string'}, 400)
+    return symbol, None
+
+def _get_price(data):
+    """Price payload for data['symbol'] (or the gold symbol)"""
+    symbol, error = _requested_symbol(data)
+    if error is not None:
+        return error
+    
+    # Unknown symbols never get a poller
+    spec = symbol_specs.get(symbol)
+    if spec is None:
+        return {'error': f'Could not get symbol info for {symbol}'}, 400
+    
+    # Concurrent requests for the same symbol share one poller and its cached tick
+    try:
+        poller = tick_pollers.get(symbol)
+    except TickPollersFull as e:
+        return {'error': str(e), 'next_poll_ms': suggest_poll_interval()}, 503
+    tick = poller.latest_tick()
+    if tick is None:
+        error = poller.error or f'No price data available for {symbol} (market may be closed)'
+        return {'error': error, 'next_poll_ms': suggest_poll_interval()}, 400
+    
+    if spec.trade_mode == mt5.SYMBOL_TRADE_MODE_DISABLED:
+        return {'error': f'Trading disabled for {symbol}'}, 400
+    
+    return {
+        'success': True,
+        'symbol': symbol,
+        'price': round(tick.price, 2),
+        'bid': round(tick.bid, 2),
+        'ask': round(tick.ask, 2),
+        'spread': round(tick.ask - tick.bid, 2),
+        'timestamp': tick.time,
+        'seq': tick.seq,
+        'age_ms': int(tick.age * 1000),
+        'next_poll_ms': suggest_poll_interval(tick.age)
+    }, 200
+
 @app.route('/api/get_price', methods=['POST'])
 @verify_signature
 def get_price():
     """Get current price for a symbol"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        data = request.get_json()
-        symbol = data.get('symbol')
+        payload, status_code = _get_price(request.get_json() or {})
+        return jsonify(payload), status_code
         
+    except Exception as e:
+        logger.error("Error in get_price: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# Upper bound on symbols per /api/get_prices request
+MAX_QUOTE_SYMBOLS = 100
+
+def _get_prices(data):
+    """Columnar quote payload for data['symbols'] (or the gold symbol)"""
+    symbols = data.get('symbols')
+    
+    if not symbols:
+        symbol = get_gold_symbol()
         if not symbol:
-            symbol = get_gold_symbol()
-            if not symbol:
-                return jsonify({'error': 'No symbol provided and could not auto-detect gold symbol'}), 400
+            return {'error': 'No symbols provided and could not auto-detect gold symbol'}, 400
+        symbols = [symbol]
+    
+    if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+        return {'error': 'symbols must be a list of strings'}, 400
+    
+    if len(symbols) > MAX_QUOTE_SYMBOLS:
+        return {'error': f'Too many symbols. Maximum: {MAX_QUOTE_SYMBOLS}'}, 400
+    
+    names, bids, asks, digits, times, missing = [], [], [], [], [], []
+    for symbol in symbols:
+        spec = symbol_specs.get(symbol)
+        if spec is None:
+            missing.append(symbol)
+            continue
+        
+        # Symbols with a running poller are served from its cache, others from a shared snapshot
+        tick = tick_pollers.peek(symbol) or quote_snapshots.get(symbol)
+        if tick is None:
+            missing.append(symbol)
+            continue
+        
+        names.append(symbol)
+        bids.append(tick.bid)
+        asks.append(tick.ask)
+        digits.append(spec.digits)
+        times.append(tick.time)
+    
+    bid = np.array(bids, dtype=np.float64)
+    ask = np.array(asks, dtype=np.float64)
+    scale = np.power(10.0, np.array(digits, dtype=np.float64))
+    
+    def round_to_digits(values):
+        return (np.round(values * scale) / scale).tolist()
+    
+    return {
+        'success': True,
+        'symbols': names,
+        'price': round_to_digits((bid + ask) / 2),
+        'bid': round_to_digits(bid),
+        'ask': round_to_digits(ask),
+        'spread': round_to_digits(ask - bid),
+        'timestamp': times,
+        'missing': missing
+    }, 200
+
+@app.route('/api/get_prices', methods=['POST'])
+@verify_signature
+def get_prices():
+    """Get quotes for several symbols in one columnar response"""
+    try:
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        if not mt5.symbol_select(symbol, True):
-            return jsonify({'error': f'Symbol {symbol} not found or not available'}), 400
+        payload, status_code = _get_prices(request.get_json() or {})
+        return jsonify(payload), status_code
         
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            return jsonify({'error': f'Could not get symbol info for {symbol}'}), 400
+    except Exception as e:
+        logger.error("Error in get_prices: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# Upper bound on raw points returned by /api/get_indicators
+MAX_HISTORY_POINTS = 1000
+
+def _history_points(data):
+    try:
+        return min(max(int(data.get('points', 0)), 0), MAX_HISTORY_POINTS)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+def _get_indicators(data):
+    """Indicator payload from the symbol's tick history"""
+    symbol, error = _requested_symbol(data)
+    if error is not None:
+        return error
+    
+    if symbol_specs.get(symbol) is None:
+        return {'error': f'Could not get symbol info for {symbol}'}, 400
+    
+    # Keep the poller running so the history keeps filling
+    try:
+        tick_pollers.get(symbol).latest_tick()
+    except TickPollersFull as e:
+        return {'error': str(e)}, 503
+    history = tick_histories.get(symbol)
+    
+    payload = {'success': True, 'symbol': symbol, 'indicators': history.indicators()}
+    
+    points = _history_points(data)
+    if points:
+        times, prices = history.recent(points)
+        payload['history'] = {'time_msc': times, 'price': prices}
+    
+    return payload, 200
+
+@app.route('/api/get_indicators', methods=['POST'])
+@verify_signature
+def get_indicators():
+    """Get SMA/EMA, VWAP, spread stats and volatility from recent ticks"""
+    try:
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        if symbol_info.trade_mode == mt5.SYMBOL_TRADE_MODE_DISABLED:
-            return jsonify({'error': f'Trading disabled for {symbol}'}), 400
+        payload, status_code = _get_indicators(request.get_json() or {})
+        return jsonify(payload), status_code
         
-        tick = mt5.symbol_info_tick(symbol)
-        if tick is None:
-            return jsonify({'error': f'No price data available for {symbol} (market may be closed)'}), 400
+    except Exception as e:
+        logger.error("Error in get_indicators: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/stream_price', methods=['POST'])
+@verify_signature
+def stream_price():
+    """Stream price changes for a symbol as Server-Sent Events"""
+    try:
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        price = (tick.bid + tick.ask) / 2
+        data = request.get_json()
+        symbol, error = _requested_symbol(data)
+        if error is not None:
+            return jsonify(error[0]), error[1]
         
-        return jsonify({
-            'success': True,
-            'symbol': symbol,
-            'price': round(price, 2),
-            'bid': round(tick.bid, 2),
-            'ask': round(tick.ask, 2),
-            'spread': round(tick.ask - tick.bid, 2),
-            'timestamp': tick.time
-        }), 200
+        # Resume after the last sequence the client saw
+        last_seq = data.get('last_seq', 0)
+        last_event_id = request.headers.get('Last-Event-ID')
+        if last_event_id and last_event_id.isdigit():
+            last_seq = int(last_event_id)
+        
+        if symbol_specs.get(symbol) is None:
+            return jsonify({'error': f'Could not get symbol info for {symbol}'}), 400
+        
+        # Start the poller now so a full registry is refused before the stream opens
+        try:
+            tick_pollers.get(symbol)
+        except TickPollersFull as e:
+            return jsonify({'error': str(e)}), 503
+        
+        if not price_stream_slots.acquire(blocking=False):
+            return jsonify({'error': 'Too many price streams, poll /api/get_price instead'}), 503
+        
+        def generate(last_seq):
+            started = time.time()
+            last_error = None
+            yield f"retry: {STREAM_HEARTBEAT_INTERVAL * 1000}\n\n"
+            
+            while time.time() - started < STREAM_MAX_DURATION:
+                try:
+                    poller = tick_pollers.get(symbol)
+                except TickPollersFull as e:
+                    yield format_sse({'error': str(e), 'symbol': symbol}, event='error')
+                    break
+                tick = poller.wait_for_update(last_seq, STREAM_HEARTBEAT_INTERVAL)
+                
+                if tick is None:
+                    if poller.error and poller.error != last_error:
+                        last_error = poller.error
+                        yield format_sse({'error': poller.error, 'symbol': symbol}, event='error')
+                    else:
+                        yield ": heartbeat\n\n"
+                    continue
+                
+                last_seq = tick.seq
+                last_error = None
+                yield format_sse({
+                    'symbol': symbol,
+                    'price': round(tick.price, 2),
+                    'bid': round(tick.bid, 2),
+                    'ask': round(tick.ask, 2),
+                    'spread': round(tick.ask - tick.bid, 2),
+                    'timestamp': tick.time,
+                    'seq': tick.seq
+                }, event='price', event_id=tick.seq)
+        
+        response = Response(stream_with_context(generate(last_seq)), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        # Runs when the server closes the response, even if the stream never started
+        response.call_on_close(price_stream_slots.release)
+        return response
         
     except Exception as e:
-        print(f"Error in get_price: {str(e)}")
+        logger.error("Error in stream_price: %s", e)
         return jsonify({'error': str(e)}), 500
 
+Order = namedtuple('Order', 'symbol action lot_size')
+
+def _prepare_order(data):
+    """Validate an order request against the cached symbol spec
+    
+    Returns (Order, None), or (None, (payload, status)) when it is rejected.
+    """
+    action = data.get('action')
+    try:
+        lot_size = float(data.get('lot_size', 0.01))
+    except (TypeError, ValueError):
+        return None, ({'error': 'Invalid lot size'}, 400)
+    # NaN passes every comparison below; infinities are never valid either
+    if not math.isfinite(lot_size):
+        return None, ({'error': 'Invalid lot size'}, 400)
+    
+    symbol, error = _requested_symbol(data)
+    if error is not None:
+        return None, error
+    
+    if action not in ['buy', 'sell']:
+        return None, ({'error': 'Invalid action. Use "buy" or "sell"'}, 400)
+    
+    # Selecting the symbol and reading its limits is cached per symbol
+    spec = symbol_specs.get(symbol)
+    if spec is None:
+        return None, ({'error': f'Symbol {symbol} not found or not available'}, 400)
+    
+    if spec.trade_mode == mt5.SYMBOL_TRADE_MODE_DISABLED:
+        return None, ({'error': f'Trading disabled for {symbol}'}, 400)
+    
+    if lot_size < spec.volume_min:
+        return None, ({'error': f'Lot size too small. Minimum: {spec.volume_min}'}, 400)
+    
+    if lot_size > spec.volume_max:
+        return None, ({'error': f'Lot size too large. Maximum: {spec.volume_max}'}, 400)
+    
+    return Order(symbol, action, lot_size), None
+
+def _send_order(order, tick=None):
+    """Send a validated market order to MT5; returns (payload, status)"""
+    if tick is None:
+        tick = mt5.symbol_info_tick(order.symbol)
+    if tick is None:
+        return {'error': f'No price data available for {order.symbol} (market may be closed)'}, 400
+    
+    order_type = mt5.ORDER_TYPE_BUY if order.action == 'buy' else mt5.ORDER_TYPE_SELL
+    price = tick.ask if order.action == 'buy' else tick.bid
+    
+    request_data = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": order.symbol,
+        "volume": order.lot_size,
+        "type": order_type,
+        "price": price,
+        "deviation": 20,
+        "magic": 234000,
+        "comment": "Gold trading app",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_IOC,
+    }
+    
+    result = mt5.order_send(request_data)
+    
+    # Whatever the outcome, the next account/positions read must see it
+    account_snapshots.invalidate()
+    positions_snapshots.invalidate()
+    
+    if result is None:
+        return {'success': False, 'error': f'Trade failed: {mt5.last_error()}', 'symbol_used': order.symbol}, 500
+    
+    if result.retcode != mt5.TRADE_RETCODE_DONE:
+        return {
+            'success': False,
+            'error': f'Trade failed: {result.comment}',
+            'retcode': result.retcode,
+            'symbol_used': order.symbol
+        }, 400
+    
+    return {
+        'success': True,
+        'order_id': result.order,
+        'volume': result.volume,
+        'price': result.price,
+        'action': order.action,
+        'symbol': order.symbol
+    }, 200
+
+# Orders remembered (by handle and idempotency key) for status queries and retries
+ORDER_HISTORY_SIZE = 1000
+
+# Accepted orders waiting to be sent before new ones are turned away
+ORDER_QUEUE_SIZE = 64
+
+# Longest /api/order_status and keyed /api/execute_trade calls wait for a fill (milliseconds)
+ORDER_MAX_WAIT_MS = 10000
+
+# HTTP status of a finished order's result, by order state
+ORDER_STATE_STATUS = {'filled': 200, 'rejected': 400, 'failed': 500}
+
+class OrderQueueFull(Exception):
+    """The order pipeline cannot accept more orders right now"""
+
+class OrderPipeline:
+    """Accepts orders immediately and sends them to MT5 one by one on a worker thread
+    
+    Each order gets a handle; its state goes queued -> sending -> filled,
+    rejected or failed. An order submitted again with the same idempotency
+    key returns the original record instead of sending a second order, so
+    double taps and retries after a timeout cannot duplicate a trade.
+    """
+    
+    def __init__(self, send, history_size=ORDER_HISTORY_SIZE, queue_size=ORDER_QUEUE_SIZE):
+        self._send = send
+        self.history_size = history_size
+        self._orders = OrderedDict()  # handle -> record, oldest first
+        self._by_key = {}  # idempotency key -> handle
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._changed = threading.Condition()
+        self._thread = None
+        self._next_id = 1
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="order-pipeline", daemon=True)
+            self._thread.start()
+    
+    def submit(self, order, idempotency_key=None):
+        """Queue order; returns (record copy, duplicate)
+        
+        Raises OrderQueueFull, or ValueError if the key was already used for
+        a different order.
+        """
+        with self._changed:
+            if idempotency_key is not None:
+                handle = self._by_key.get(idempotency_key)
+                if handle is not None:
+                    record = self._orders[handle]
+                    if record['order'] != order._asdict():
+                        raise ValueError('Idempotency key was already used for a different order')
+                    return dict(record), True
+            
+            handle = f"{format(int(time.time()), 'x')}-{self._next_id}"
+            self._next_id += 1
+            record = {
+                'order_handle': handle,
+                'idempotency_key': idempotency_key,
+                'order': order._asdict(),
+                'state': 'queued',
+                'submitted_at': int(time.time() * 1000),
+                'completed_at': None,
+                'result': None
+            }
+            self._ensure_started()
+            try:
+                self._queue.put_nowait((handle, order))
+            except queue.Full:
+                raise OrderQueueFull('Order queue is full')
+            
+            self._orders[handle] = record
+            if idempotency_key is not None:
+                self._by_key[idempotency_key] = handle
+            self._evict()
+            return dict(record), False
+    
+    def _evict(self):
+        # Only finished orders are forgotten; pending ones must stay queryable
+        while len(self._orders) > self.history_size:
+            handle, record = next(iter(self._orders.items()))
+            if record['completed_at'] is None:
+                break
+            del self._orders[handle]
+            if record['idempotency_key'] is not None:
+                self._by_key.pop(record['idempotency_key'], None)
+    
+    def find(self, handle=None, idempotency_key=None):
+        with self._changed:
+            if handle is None and idempotency_key is not None:
+                handle = self._by_key.get(idempotency_key)
+            record = self._orders.get(handle)
+            return dict(record) if record is not None else None
+    
+    def wait(self, handle, timeout):
+        """Record copy once the order has finished or timeout seconds have passed"""
+        with self._changed:
+            self._changed.wait_for(lambda: handle not in self._orders or
+                                   self._orders[handle]['completed_at'] is not None, timeout)
+            record = self._orders.get(handle)
+            return dict(record) if record is not None else None
+    
+    def _update(self, handle, **fields):
+        with self._changed:
+            record = self._orders.get(handle)
+            if record is not None:
+                record.update(fields)
+            self._changed.notify_all()
+    
+    def _run(self):
+        while True:
+            handle, order = self._queue.get()
+            self._update(handle, state='sending')
+            try:
+                payload, status_code = self._send(order)
+            except Exception as e:
+                logger.error("Error sending order %s: %s", handle, e)
+                payload, status_code = {'success': False, 'error': str(e)}, 500
+            
+            if payload.get('success'):
+                state = 'filled'
+            elif status_code == 400:
+                state = 'rejected'
+            else:
+                state = 'failed'
+            logger.info("Order %s %s: %s", handle, state, payload)
+            self._update(handle, state=state, result=payload, completed_at=int(time.time() * 1000))
+
+order_pipeline = OrderPipeline(_send_order)
+
+def _order_response(record):
+    """Order record as a response: 200 once finished, 202 while still pending"""
+    payload = dict(record, success=True)
+    if record['completed_at'] is not None:
+        return payload, 200
+    return payload, 202
+
+def _idempotency_key(data):
+    """data's optional idempotency_key as (key or None, None), or (None, (payload, status))"""
+    key = data.get('idempotency_key')
+    if key is None:
+        return None, None
+    if not isinstance(key, str) or not key:
+        return None, ({'error': 'idempotency_key must be a non-empty string'}, 400)
+    return key, None
+
+def _submit_order(data):
+    """Validate and queue an order; returns (payload, status) right away"""
+    key, error = _idempotency_key(data)
+    if error is not None:
+        return error
+    
+    order, error = _prepare_order(data)
+    if error is not None:
+        return error
+    
+    try:
+        record, duplicate = order_pipeline.submit(order, key)
+    except ValueError as e:
+        return {'error': str(e)}, 409
+    except OrderQueueFull as e:
+        return {'error': str(e)}, 503
+    
+    payload, _ = _order_response(record)
+    payload['duplicate'] = duplicate
+    return payload, 200 if duplicate and record['completed_at'] is not None else 202
+
+def _wait_ms(data):
+    try:
+        return min(max(int(data.get('wait_ms', 0)), 0), ORDER_MAX_WAIT_MS)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
 @app.route('/api/execute_trade', methods=['POST'])
 @verify_signature
 def execute_trade():
-    """Execute a trade order"""
+    """Execute a trade order
+    
+    With an idempotency_key the order goes through the order pipeline, so a
+    retried request returns the first attempt's result instead of trading
+    again; if the fill takes longer than ORDER_MAX_WAIT_MS a 202 with the
+    order handle is returned.
+    """
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
         data = request.get_json()
-        symbol = data.get('symbol')
-        action = data.get('action')
-        lot_size = float(data.get('lot_size', 0.01))
+        key, error = _idempotency_key(data)
+        if error is not None:
+            return jsonify(error[0]), error[1]
         
-        if not symbol:
-            symbol = get_gold_symbol()
-            if not symbol:
-                return jsonify({'error': 'No symbol provided and could not auto-detect gold symbol'}), 400
+        if key is None:
+            order, error = _prepare_order(data)
+            if error is not None:
+                return jsonify(error[0]), error[1]
+            payload, status_code = _send_order(order)
+            return jsonify(payload), status_code
         
-        if action not in ['buy', 'sell']:
-            return jsonify({'error': 'Invalid action. Use "buy" or "sell"'}), 400
+        payload, status_code = _submit_order(data)
+        if status_code not in (200, 202):
+            return jsonify(payload), status_code
         
-        if not mt5.symbol_select(symbol, True):
-            return jsonify({'error': f'Symbol {symbol} not found or not available'}), 400
+        record = order_pipeline.wait(payload['order_handle'], ORDER_MAX_WAIT_MS / 1000)
+        if record is None or record['completed_at'] is None:
+            return jsonify(payload), 202
         
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            return jsonify({'error': f'Could not get symbol info for {symbol}'}), 400
+        result = dict(record['result'], order_handle=record['order_handle'], duplicate=payload['duplicate'])
+        return jsonify(result), ORDER_STATE_STATUS[record['state']]
+        
+    except Exception as e:
+        logger.error("Error in execute_trade: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# Most orders accepted in one /api/execute_trades request
+MAX_BASKET_SIZE = 20
+
+# Keyed basket results remembered for replaying retries
+BASKET_HISTORY_SIZE = 200
+
+class BasketResults:
+    """Results of baskets sent with an idempotency key
+    
+    The key is claimed before any order is sent. A retry with the same key
+    waits for the first attempt and gets its result back instead of
+    sending the orders again.
+    """
+    
+    def __init__(self, history_size=BASKET_HISTORY_SIZE):
+        self.history_size = history_size
+        self._baskets = OrderedDict()  # key -> {'orders': ..., 'result': (payload, status) or None}
+        self._changed = threading.Condition()
+    
+    def claim(self, key, orders, timeout):
+        """None if the caller should send the basket, else the (payload, status) to return
+        
+        Raises ValueError if the key was already used for a different basket.
+        """
+        with self._changed:
+            entry = self._baskets.get(key)
+            if entry is None:
+                self._baskets[key] = {'orders': orders, 'result': None}
+                self._evict()
+                return None
+            if entry['orders'] != orders:
+                raise ValueError('Idempotency key was already used for a different basket')
+            
+            self._changed.wait_for(lambda: entry['result'] is not None or self._baskets.get(key) is not entry,
+                                   timeout)
+            if entry['result'] is None:
+                return {'success': False, 'duplicate': True,
+                        'error': 'A basket with this idempotency key is still being sent; retry later'}, 409
+            payload, status_code = entry['result']
+            return dict(payload, duplicate=True), status_code
+    
+    def finish(self, key, result):
+        """Store the basket's (payload, status); None forgets the key so it can be sent again"""
+        with self._changed:
+            if result is None:
+                self._baskets.pop(key, None)
+            elif key in self._baskets:
+                self._baskets[key]['result'] = result
+            self._changed.notify_all()
+    
+    def _evict(self):
+        # Baskets still being sent stay, so their retries keep waiting on them
+        while len(self._baskets) > self.history_size:
+            key, entry = next(iter(self._baskets.items()))
+            if entry['result'] is None:
+                break
+            del self._baskets[key]
+
+basket_results = BasketResults()
+
+def _execute_trades(data):
+    """Validate a basket of orders up front, then send them back to back
+    
+    Every order is checked before any is sent, against one spec and one
+    tick per symbol, so an invalid clip rejects the whole basket. With
+    stop_on_failure, orders after the first failed one are skipped. With
+    an idempotency_key, a retried basket returns the first attempt's
+    result instead of trading again.
+    """
+    orders = data.get('orders')
+    if not isinstance(orders, list) or not orders:
+        return {'error': 'orders must be a non-empty list'}, 400
+    if len(orders) > MAX_BASKET_SIZE:
+        return {'error': f'Too many orders (max {MAX_BASKET_SIZE})'}, 400
+    
+    default_symbol = data.get('symbol') or get_gold_symbol()
+    prepared = []
+    errors = []
+    for index, entry in enumerate(orders):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'error': 'Order must be an object'})
+            continue
+        order, error = _prepare_order(dict(entry, symbol=entry.get('symbol') or default_symbol))
+        if error is not None:
+            errors.append(dict(error[0], index=index))
+        else:
+            prepared.append(order)
+    
+    if errors:
+        return {'success': False, 'error': 'Basket rejected; no orders were sent', 'invalid': errors}, 400
+    
+    stop_on_failure = bool(data.get('stop_on_failure', False))
+    key, error = _idempotency_key(data)
+    if error is not None:
+        return error
+    if key is None:
+        return _send_basket(prepared, stop_on_failure)
+    
+    try:
+        replay = basket_results.claim(key, ([order._asdict() for order in prepared], stop_on_failure),
+                                      ORDER_MAX_WAIT_MS / 1000)
+    except ValueError as e:
+        return {'error': str(e)}, 409
+    if replay is not None:
+        return replay
+    
+    result = None
+    try:
+        payload, status_code = _send_basket(prepared, stop_on_failure)
+        result = dict(payload, duplicate=False), status_code
+    finally:
+        basket_results.finish(key, result)
+    return result
+
+def _send_basket(prepared, stop_on_failure):
+    """Send validated orders in turn, pricing each symbol from one tick"""
+    ticks = {}
+    for symbol in dict.fromkeys(order.symbol for order in prepared):
+        ticks[symbol] = mt5.symbol_info_tick(symbol)
+        if ticks[symbol] is None:
+            return {'success': False, 'error': f'No price data available for {symbol} (market may be closed)'}, 400
+    
+    results = []
+    failed = False
+    for index, order in enumerate(prepared):
+        if failed and stop_on_failure:
+            results.append({'index': index, 'status': None, 'success': False, 'skipped': True,
+                            'error': 'Not sent: an earlier order failed'})
+            continue
+        try:
+            payload, status_code = _send_order(order, ticks[order.symbol])
+        except Exception as e:
+            logger.error("Error sending basket order %s: %s", index, e)
+            payload, status_code = {'success': False, 'error': str(e)}, 500
+        failed = failed or not payload.get('success')
+        results.append(dict(payload, index=index, status=status_code))
+    
+    filled = sum(1 for r in results if r.get('success'))
+    skipped = sum(1 for r in results if r.get('skipped'))
+    return {
+        'success': filled == len(results),
+        'filled': filled,
+        'failed': len(results) - filled - skipped,
+        'skipped': skipped,
+        'results': results
+    }, 200
+
+@app.route('/api/execute_trades', methods=['POST'])
+@verify_signature
+def execute_trades():
+    """Execute a list of orders in one request; see _execute_trades"""
+    try:
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        if symbol_info.trade_mode == mt5.SYMBOL_TRADE_MODE_DISABLED:
-            return jsonify({'error': f'Trading disabled for {symbol}'}), 400
+        payload, status_code = _execute_trades(request.get_json() or {})
+        return jsonify(payload), status_code
         
-        tick = mt5.symbol_info_tick(symbol)
-        if tick is None:
-            return jsonify({'error': f'No price data available for {symbol} (market may be closed)'}), 400
-        
-        if lot_size < symbol_info.volume_min:
-            return jsonify({'error': f'Lot size too small. Minimum: {symbol_info.volume_min}'}), 400
-        
-        if lot_size > symbol_info.volume_max:
-            return jsonify({'error': f'Lot size too large. Maximum: {symbol_info.volume_max}'}), 400
-        
-        order_type = mt5.ORDER_TYPE_BUY if action == 'buy' else mt5.ORDER_TYPE_SELL
-        price = tick.ask if action == 'buy' else tick.bid
-        
-        request_data = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": lot_size,
-            "type": order_type,
-            "price": price,
-            "deviation": 20,
-            "magic": 234000,
-            "comment": "Gold trading app",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
+    except Exception as e:
+        logger.error("Error in execute_trades: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/submit_order', methods=['POST'])
+@verify_signature
+def submit_order():
+    """Accept an order and return its handle without waiting for the fill
+    
+    Poll /api/order_status with the handle (or idempotency key) for the result.
+    """
+    try:
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        result = mt5.order_send(request_data)
+        payload, status_code = _submit_order(request.get_json() or {})
+        return jsonify(payload), status_code
         
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            return jsonify({
-                'success': False,
-                'error': f'Trade failed: {result.comment}',
-                'retcode': result.retcode,
-                'symbol_used': symbol
-            }), 400
+    except Exception as e:
+        logger.error("Error in submit_order: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/order_status', methods=['POST'])
+@verify_signature
+def order_status():
+    """State and result of a submitted order
+    
+    With wait_ms (capped at ORDER_MAX_WAIT_MS) the response is held until the
+    order finishes or the wait runs out.
+    """
+    try:
+        data = request.get_json() or {}
+        key, error = _idempotency_key(data)
+        if error is not None:
+            return jsonify(error[0]), error[1]
+        handle = data.get('order_handle')
+        if handle is not None and not isinstance(handle, str):
+            return jsonify({'error': 'order_handle must be a string'}), 400
         
-        return jsonify({
-            'success': True,
-            'order_id': result.order,
-            'volume': result.volume,
-            'price': result.price,
-            'action': action,
-            'symbol': symbol
-        }), 200
+        record = order_pipeline.find(handle, key)
+        if record is None:
+            return jsonify({'error': 'Unknown order'}), 404
+        
+        wait_ms = _wait_ms(data)
+        if wait_ms and record['completed_at'] is None:
+            record = order_pipeline.wait(record['order_handle'], wait_ms / 1000) or record
+        
+        payload, status_code = _order_response(record)
+        return jsonify(payload), status_code
         
     except Exception as e:
-        print(f"Error in execute_trade: {str(e)}")
+        logger.error("Error in order_status: %s", e)
         return jsonify({'error': str(e)}), 500
 
+def payload_etag(*values):
+    """Cheap validator for a response's content; stable for the life of the process"""
+    return format(hash(values) & 0xFFFFFFFFFFFFFFFF, '016x')
+
+def _not_modified(etag):
+    return {'success': True, 'not_modified': True, 'etag': etag}, 304
+
+def conditional_response(payload, status_code):
+    """jsonify(payload) with its ETag header; a 304 is sent without a body"""
+    etag = payload.get('etag')
+    if status_code == 304:
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    
+    response = jsonify(payload)
+    response.status_code = status_code
+    if etag:
+        response.headers['ETag'] = f'"{etag}"'
+    return response
+
+def _conditional_data(data):
+    """Request data with an If-None-Match header folded into if_none_match"""
+    header = request.headers.get('If-None-Match')
+    if header and not data.get('if_none_match'):
+        data = dict(data, if_none_match=header.strip().strip('"'))
+    return data
+
+def _load_account():
+    """(payload, etag) for the account summary, or None if MT5 has no account info"""
+    account_info = mt5.account_info()
+    if account_info is None:
+        return None
+    
+    payload = {
+        'success': True,
+        'balance': round(account_info.balance, 2),
+        'equity': round(account_info.equity, 2),
+        'margin': round(account_info.margin, 2),
+        'free_margin': round(account_info.margin_free, 2),
+        'leverage': account_info.leverage,
+        'currency': account_info.currency
+    }
+    return payload, payload_etag(*payload.values())
+
+account_snapshots = SharedSnapshots(_load_account, ACCOUNT_SNAPSHOT_INTERVAL)
+
+def _get_account_info(data):
+    """Account summary payload, from a snapshot at most ACCOUNT_SNAPSHOT_INTERVAL old
+    
+    Answers 304 (not_modified) when if_none_match is the current ETag.
+    """
+    snapshot = account_snapshots.get()
+    if snapshot is None:
+        return {'error': 'Failed to get account info'}, 500
+    
+    payload, etag = snapshot
+    if data.get('if_none_match') == etag:
+        return _not_modified(etag)
+    
+    return dict(payload, etag=etag), 200
+
 @app.route('/api/get_account_info', methods=['POST'])
 @verify_signature
 def get_account_info():
     """Get account information"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        account_info = mt5.account_info()
-        if account_info is None:
-            return jsonify({'error': 'Failed to get account info'}), 500
-        
-        return jsonify({
-            'success': True,
-            'balance': round(account_info.balance, 2),
-            'equity': round(account_info.equity, 2),
-            'margin': round(account_info.margin, 2),
-            'free_margin': round(account_info.margin_free, 2),
-            'leverage': account_info.leverage,
-            'currency': account_info.currency
-        }), 200
+        payload, status_code = _get_account_info(_conditional_data(request.get_json() or {}))
+        return conditional_response(payload, status_code)
         
     except Exception as e:
-        print(f"Error in get_account_info: {str(e)}")
+        logger.error("Error in get_account_info: %s", e)
         return jsonify({'error': str(e)}), 500
 
+# Position book changes remembered for since_version delta responses
+POSITION_HISTORY_SIZE = 256
+
+class PositionBook:
+    """Versioned copy of the open positions, used to answer delta requests"""
+    
+    def __init__(self, history_size=POSITION_HISTORY_SIZE):
+        # A new epoch after restart tells clients their version is meaningless
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.version = 0
+        self._positions = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+    
+    def update(self, positions):
+        """Replace the book with a new list of position dicts; returns the version"""
+        current = {p['ticket']: p for p in positions}
+        with self._lock:
+            previous = self._positions
+            opened = [t for t in current if t not in previous]
+            closed = [t for t in previous if t not in current]
+            changed = [t for t, p in current.items() if t in previous and previous[t] != p]
+            if opened or changed or closed:
+                self.version += 1
+                self._history.append((self.version, opened, changed, closed))
+            self._positions = current
+            return self.version
+    
+    def delta_since(self, version):
+        """(opened, changed, closed) tickets since version, or None if too old to tell"""
+        with self._lock:
+            if version > self.version:
+                return None
+            entries = [entry for entry in self._history if entry[0] > version]
+            if version < self.version and (not entries or entries[0][0] != version + 1):
+                return None
+            
+            opened, changed, closed = set(), set(), set()
+            for _, entry_opened, entry_changed, entry_closed in entries:
+                opened.update(entry_opened)
+                closed.difference_update(entry_opened)
+                changed.update(t for t in entry_changed if t not in opened)
+                for ticket in entry_closed:
+                    if ticket in opened:
+                        opened.discard(ticket)
+                    else:
+                        changed.discard(ticket)
+                        closed.add(ticket)
+            
+            positions = self._positions
+            return ([positions[t] for t in opened if t in positions],
+                    [positions[t] for t in changed if t in positions],
+                    sorted(closed))
+
+position_book = PositionBook()
+
+PositionsSnapshot = namedtuple('PositionsSnapshot', 'positions gold_positions exposure gold_symbol version etag')
+
+def _load_positions():
+    """Positions, their per-symbol exposure and the book version, read once
+    
+    Exposure is computed in the same pass over the positions.
+    """
+    all_positions = mt5.positions_get()
+    if all_positions is None:
+        all_positions = []
+    
+    gold_symbol = get_gold_symbol()
+    
+    position_list = []
+    gold_position_list = []
+    exposure = {}
+    for pos in all_positions:
+        is_buy = pos.type == mt5.POSITION_TYPE_BUY
+        position = {
+            'ticket': pos.ticket,
+            'symbol': pos.symbol,
+            'volume': pos.volume,
+            'type': 'buy' if is_buy else 'sell',
+            'price_open': round(pos.price_open, 2),
+            'price_current': round(pos.price_current, 2),
+            'profit': round(pos.profit, 2),
+            'comment': pos.comment
+        }
+        position_list.append(position)
+        if pos.symbol == gold_symbol:
+            gold_position_list.append(position)
+        
+        totals = exposure.get(pos.symbol)
+        if totals is None:
+            totals = exposure[pos.symbol] = {'net_volume': 0.0, 'buy_volume': 0.0, 'sell_volume': 0.0,
+                                             'profit': 0.0, 'count': 0}
+        totals['buy_volume' if is_buy else 'sell_volume'] += pos.volume
+        totals['net_volume'] += pos.volume if is_buy else -pos.volume
+        totals['profit'] += pos.profit
+        totals['count'] += 1
+    
+    for totals in exposure.values():
+        for key in ('net_volume', 'buy_volume', 'sell_volume'):
+            totals[key] = round(totals[key], 8)
+        totals['profit'] = round(totals['profit'], 2)
+    
+    version = position_book.update(position_list)
+    
+    # The book's version moves whenever any position field does
+    etag = payload_etag(position_book.epoch, version, gold_symbol)
+    return PositionsSnapshot(tuple(position_list), tuple(gold_position_list), exposure,
+                             gold_symbol, version, etag)
+
+positions_snapshots = SharedSnapshots(_load_positions, POSITIONS_SNAPSHOT_INTERVAL)
+
+def _get_positions(data):
+    """Open positions payload, from a snapshot at most POSITIONS_SNAPSHOT_INTERVAL old
+    
+    With since_version (and the matching epoch) only tickets opened,
+    changed or closed since that version are returned. Answers 304
+    (not_modified) when if_none_match is the current ETag.
+    """
+    snapshot = positions_snapshots.get()
+    if data.get('if_none_match') == snapshot.etag:
+        return _not_modified(snapshot.etag)
+    
+    payload = {
+        'success': True,
+        'detected_gold_symbol': snapshot.gold_symbol,
+        'exposure': snapshot.exposure,
+        'version': snapshot.version,
+        'epoch': position_book.epoch,
+        'etag': snapshot.etag
+    }
+    
+    since_version = data.get('since_version')
+    if isinstance(since_version, int) and data.get('epoch') == position_book.epoch:
+        delta = position_book.delta_since(since_version)
+        if delta is not None:
+            opened, changed, closed = delta
+            payload.update({'delta': True, 'opened': opened, 'changed': changed, 'closed': closed})
+            return payload, 200
+    
+    payload.update({
+        'delta': False,
+        'all_positions': list(snapshot.positions),
+        'gold_positions': list(snapshot.gold_positions)
+    })
+    return payload, 200
+
 @app.route('/api/get_positions', methods=['POST'])
 @verify_signature
 def get_positions():
     """Get current positions"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
-        all_positions = mt5.positions_get()
-        if all_positions is None:
-            all_positions = []
+        payload, status_code = _get_positions(_conditional_data(request.get_json() or {}))
+        return conditional_response(payload, status_code)
         
-        gold_symbol = get_gold_symbol()
-        if gold_symbol:
-            gold_positions = mt5.positions_get(symbol=gold_symbol)
-            if gold_positions is None:
-                gold_positions = []
-        else:
-            gold_positions = []
-        
-        position_list = []
-        for pos in all_positions:
-            position_list.append({
-                'ticket': pos.ticket,
-                'symbol': pos.symbol,
-                'volume': pos.volume,
-                'type': 'buy' if pos.type == mt5.POSITION_TYPE_BUY else 'sell',
-                'price_open': round(pos.price_open, 2),
-                'price_current': round(pos.price_current, 2),
-                'profit': round(pos.profit, 2),
-                'comment': pos.comment
-            })
-        
-        gold_position_list = []
-        for pos in gold_positions:
-            gold_position_list.append({
-                'ticket': pos.ticket,
-                'symbol': pos.symbol,
-                'volume': pos.volume,
-                'type': 'buy' if pos.type == mt5.POSITION_TYPE_BUY else 'sell',
-                'price_open': round(pos.price_open, 2),
-                'price_current': round(pos.price_current, 2),
-                'profit': round(pos.profit, 2),
-                'comment': pos.comment
-            })
+    except Exception as e:
+        logger.error("Error in get_positions: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# Read-only operations that can be combined in one /api/batch call
+BATCH_OPERATIONS = {
+    'get_price': _get_price,
+    'get_prices': _get_prices,
+    'get_indicators': _get_indicators,
+    'get_account_info': _get_account_info,
+    'get_positions': _get_positions,
+}
+
+MAX_BATCH_SIZE = 10
+
+@app.route('/api/batch', methods=['POST'])
+@verify_signature
+def batch():
+    """Run several read-only operations under a single signature check"""
+    try:
+        data = request.get_json()
+        operations = data.get('requests')
         
-        return jsonify({
-            'success': True,
-            'all_positions': position_list,
-            'gold_positions': gold_position_list,
-            'detected_gold_symbol': gold_symbol
-        }), 200
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'requests must be a non-empty list'}), 400
+        
+        if len(operations) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Too many operations in batch. Maximum: {MAX_BATCH_SIZE}'}), 400
+        
+        if not mt5_connection.ensure_connected():
+            return jsonify({'error': 'MT5 initialization failed'}), 500
+        
+        results = []
+        for operation in operations:
+            endpoint = operation.get('endpoint') if isinstance(operation, dict) else None
+            handler = BATCH_OPERATIONS.get(endpoint)
+            if handler is None:
+                results.append({'endpoint': endpoint, 'status': 400,
+                                'body': {'error': f'Unsupported batch operation: {endpoint}'}})
+                continue
+            
+            # One failing operation must not take the others down with it
+            try:
+                payload, status_code = handler(operation.get('data') or {})
+            except Exception as e:
+                logger.error("Error in batch operation %s: %s", endpoint, e)
+                payload, status_code = {'error': str(e)}, 500
+            results.append({'endpoint': endpoint, 'status': status_code, 'body': payload})
+        
+        return jsonify({'success': True, 'results': results}), 200
         
     except Exception as e:
-        print(f"Error in get_positions: {str(e)}")
+        logger.error("Error in batch: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/set_gold_symbol', methods=['POST'])
@@ -451,7 +2273,7 @@ def get_positions():
 def set_gold_symbol():
     """Manually set the gold symbol if auto-detection fails"""
     try:
-        if not mt5.initialize():
+        if not mt5_connection.ensure_connected():
             return jsonify({'error': 'MT5 initialization failed'}), 500
         
         data = request.get_json()
@@ -459,6 +2281,8 @@ def set_gold_symbol():
         
         if not symbol:
             return jsonify({'error': 'Symbol parameter required'}), 400
+        if not isinstance(symbol, str):
+            return jsonify({'error': 'symbol must be a string'}), 400
         
         if not mt5.symbol_select(symbol, True):
             return jsonify({'error': f'Symbol {symbol} not found or not available'}), 400
@@ -468,10 +2292,12 @@ def set_gold_symbol():
             return jsonify({'error': f'No price data available for {symbol}'}), 400
         
         global GOLD_SYMBOL
+        symbol_specs.invalidate(GOLD_SYMBOL)
+        symbol_specs.invalidate(symbol)
         GOLD_SYMBOL = symbol
         price = (tick.bid + tick.ask) / 2
         
-        print(f"Gold symbol manually set to: {symbol}")
+        logger.info("Gold symbol manually set to: %s", symbol)
         
         return jsonify({
             'success': True,
@@ -481,19 +2307,23 @@ def set_gold_symbol():
         }), 200
         
     except Exception as e:
-        print(f"Error setting gold symbol: {str(e)}")
+        logger.error("Error setting gold symbol: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/status', methods=['GET'])
 def status():
     """Check API status and gold symbol detection"""
     try:
-        mt5_connected = mt5.account_info() is not None
-        gold_symbol = get_gold_symbol()
+        mt5_connected = mt5_connection.ensure_connected() and account_snapshots.get() is not None
+        gold_symbol = get_gold_symbol() if mt5_connected else GOLD_SYMBOL
         
         status_info = {
             'success': True,
             'mt5_connected': mt5_connected,
+            'mt5_connection': mt5_connection.state(),
+            'mt5_queue_depth': mt5_executor.queue_depth,
+            'snapshot_loads': {'account': account_snapshots.loads, 'positions': positions_snapshots.loads,
+                               'quotes': quote_snapshots.loads},
             'detected_gold_symbol': gold_symbol,
             'api_version': '1.1',
             'message': 'Flask API is alive'
@@ -501,9 +2331,10 @@ def status():
         
         if gold_symbol:
             try:
-                tick = mt5.symbol_info_tick(gold_symbol)
+                tick = tick_pollers.get(gold_symbol).latest_tick()
                 if tick:
-                    status_info['gold_price'] = round((tick.bid + tick.ask) / 2, 2)
+                    status_info['gold_price'] = round(tick.price, 2)
+                    status_info['gold_price_age_ms'] = int(tick.age * 1000)
             except:
                 status_info['gold_price'] = None
                 status_info['message'] = f'Gold symbol {gold_symbol} detected but price unavailable'
@@ -511,10 +2342,36 @@ def status():
         return jsonify(status_info), 200
         
     except Exception as e:
-        print(f"Error in status endpoint: {str(e)}")
+        logger.error("Error in status endpoint: %s", e)
         return jsonify({'error': str(e), 'success': False}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Request and MT5 call latency, errors and in-flight counts in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Request-handling threads in production mode: 16 for ordinary requests
+# plus one for every price stream that may be open
+PRODUCTION_THREADS = 16 + MAX_PRICE_STREAMS
+
+def run_production(host='0.0.0.0', port=5000, threads=PRODUCTION_THREADS):
+    """Serve the API with waitress instead of the Werkzeug development server
+    
+    Workers are threads in this one process: MT5 attaches a terminal per
+    process and all MT5 calls go through the single mt5_executor thread.
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        print("Production mode needs waitress: pip install waitress")
+        return
+    
+    print(f"Starting production server on {host}:{port} with {threads} threads...")
+    serve(app, host=host, port=port, threads=threads)
+
 if __name__ == '__main__':
+    production = '--production' in sys.argv
+    
     if initialize_mt5():
         print("Starting Flask API server...")
         print("Detecting gold symbol...")
@@ -527,19 +2384,30 @@ if __name__ == '__main__':
         
         print("\nAPI Endpoints:")
         print("- GET /api/status - Check status and detected symbols")
+        print("- GET /api/metrics - Latency histograms and error counts (Prometheus format)")
         print("- POST /api/detect_gold_symbol - Re-run gold symbol detection")
         print("- POST /api/set_gold_symbol - Manually set gold symbol")
         print("- POST /api/list_symbols - List all available symbols")
         print("- POST /api/get_price - Get current price")
+        print("- POST /api/get_prices - Get quotes for a list of symbols")
+        print("- POST /api/stream_price - Stream price changes (Server-Sent Events)")
+        print("- POST /api/get_indicators - Get moving averages, VWAP, spread and volatility")
         print("- POST /api/execute_trade - Execute trades")
+        print("- POST /api/execute_trades - Execute a basket of orders in one request")
+        print("- POST /api/submit_order - Queue a trade and return its order handle")
+        print("- POST /api/order_status - State of a queued trade (optionally waiting for the fill)")
         print("- POST /api/get_positions - Get current positions")
         print("- POST /api/get_account_info - Get account information")
+        print("- POST /api/batch - Combine get_price, get_positions and get_account_info calls")
         
         try:
-            print("Starting Flask server on port 5000...")
             print("Server accessible at: http://92.118.46.58:5000")
-            app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
+            if production:
+                run_production()
+            else:
+                print("Starting Flask development server on port 5000 (use --production for waitress)...")
+                app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
         except Exception as e:
             print(f"Failed to start server: {e}")
     else:
-        print("Failed to initialize MT5")
\ No newline at end of file
+        print("Failed to initialize MT5")
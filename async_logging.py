@@ -0,0 +1,98 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Default level; set GOLD_LOG_LEVEL=DEBUG to see request/response details
+DEFAULT_LEVEL = os.environ.get('GOLD_LOG_LEVEL', 'INFO').upper()
+
+# Longest message written; longer ones (e.g. response bodies) are cut
+MAX_MESSAGE_LENGTH = 500
+
+# Each call site may log at most RATE_LIMIT_COUNT messages per RATE_LIMIT_PERIOD seconds
+RATE_LIMIT_COUNT = 5
+RATE_LIMIT_PERIOD = 10.0
+
+class TruncateFilter(logging.Filter):
+    """Cuts formatted messages down to max_length characters"""
+
+    def __init__(self, max_length=MAX_MESSAGE_LENGTH):
+        super().__init__()
+        self.max_length = max_length
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = f"{message[:self.max_length]}... [{len(message) - self.max_length} chars truncated]"
+            record.args = None
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """Drops messages from a call site that logs more than count times per period
+
+    The first message let through after a quiet spell reports how many
+    were dropped.
+    """
+
+    def __init__(self, count=RATE_LIMIT_COUNT, period=RATE_LIMIT_PERIOD):
+        super().__init__()
+        self.count = count
+        self.period = period
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+                return True
+            if window[1] < self.count:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+def _start_listener():
+    """Start the single thread that does the actual (blocking) log output"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+            _listener = QueueListener(_queue, handler)
+            _listener.start()
+            atexit.register(_listener.stop)
+
+def get_logger(name, level=DEFAULT_LEVEL):
+    """Logger whose records are queued and written by a background thread
+
+    Filtering, rate limiting and truncation happen on the calling thread;
+    no I/O does.
+    """
+    logger = logging.getLogger(name)
+    if not any(isinstance(h, QueueHandler) for h in logger.handlers):
+        _start_listener()
+        handler = QueueHandler(_queue)
+        handler.addFilter(RateLimitFilter())
+        handler.addFilter(TruncateFilter())
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+    return logger
+
+def set_log_level(name, level):
+    """Switch verbosity at runtime, e.g. set_log_level('gold_api', 'DEBUG')"""
+    logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
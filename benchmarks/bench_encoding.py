@@ -0,0 +1,113 @@
+"""Micro-benchmark: response size and encode/decode CPU per encoding
+
+Compares what jsonify() sends today (compact, sorted-key JSON) with orjson
+and MessagePack, each with and without gzip, on payloads shaped like the
+API's larger responses. orjson and msgpack are optional and skipped when
+not installed.
+
+    python benchmarks/bench_encoding.py [iterations]
+"""
+import gzip
+import json
+import random
+import sys
+import timeit
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Same level and threshold as app.py
+GZIP_LEVEL = 5
+GZIP_MIN_SIZE = 1024
+
+def make_payloads(seed=7):
+    rng = random.Random(seed)
+    symbols = [f'SYM{i:04d}' for i in range(400)] + ['XAUUSD', 'XAUEUR', 'XAGUSD', 'EURUSD']
+
+    positions = [{
+        'ticket': 100000 + i,
+        'symbol': rng.choice(['XAUUSD', 'XAUEUR', 'XAGUSD']),
+        'volume': round(rng.choice([0.01, 0.02, 0.05, 0.1]), 2),
+        'type': rng.choice(['buy', 'sell']),
+        'price_open': round(rng.uniform(2300, 2400), 2),
+        'price_current': round(rng.uniform(2300, 2400), 2),
+        'profit': round(rng.uniform(-50, 50), 2),
+        'comment': 'Gold trading app'
+    } for i in range(100)]
+
+    start = 1_750_000_000_000
+    prices = [2350.0]
+    for _ in range(999):
+        prices.append(round(prices[-1] + rng.gauss(0, 0.2), 2))
+
+    return {
+        'get_price': {'success': True, 'symbol': 'XAUUSD', 'price': 2350.12, 'bid': 2349.97, 'ask': 2350.27,
+                      'spread': 0.3, 'timestamp': 1750000000, 'seq': 1234, 'age_ms': 120, 'next_poll_ms': 500},
+        'get_positions': {'success': True, 'delta': False, 'detected_gold_symbol': 'XAUUSD',
+                          'all_positions': positions,
+                          'gold_positions': [p for p in positions if p['symbol'] == 'XAUUSD'],
+                          'exposure': {'XAUUSD': {'net_volume': 0.3, 'buy_volume': 1.2, 'sell_volume': 0.9,
+                                                  'profit': 12.5, 'count': 40}},
+                          'version': 17, 'epoch': '18f3a2b1c00'},
+        'list_symbols': {'success': True, 'detected_gold_symbol': 'XAUUSD',
+                         'gold_related_symbols': ['XAUUSD', 'XAUEUR', 'XAGUSD'],
+                         'sample_symbols': symbols[:20], 'total_symbols': len(symbols), 'catalog_age': 12.3,
+                         'prefix_matches': symbols[:100]},
+        'get_indicators': {'success': True, 'symbol': 'XAUUSD',
+                           'indicators': {'sma_20': 2350.1, 'ema_20': 2350.2, 'vwap': 2349.9,
+                                          'spread': 0.3, 'volatility': 0.0004},
+                           'history': {'time_msc': [start + i * 250 for i in range(1000)], 'price': prices}},
+    }
+
+def encoders():
+    """name -> (encode, decode) on bytes"""
+    def json_encode(obj):
+        return json.dumps(obj, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+    result = {'json': (json_encode, json.loads)}
+    if orjson is not None:
+        result['orjson'] = (lambda obj: orjson.dumps(obj, option=orjson.OPT_SORT_KEYS), orjson.loads)
+    if msgpack is not None:
+        result['msgpack'] = (msgpack.packb, lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False))
+    return result
+
+def with_gzip(encode, decode):
+    def gzip_encode(obj):
+        data = encode(obj)
+        return gzip.compress(data, GZIP_LEVEL) if len(data) >= GZIP_MIN_SIZE else data
+
+    def gzip_decode(data):
+        return decode(gzip.decompress(data) if data[:2] == b'\x1f\x8b' else data)
+    return gzip_encode, gzip_decode
+
+def bench(iterations):
+    payloads = make_payloads()
+    variants = {}
+    for name, (encode, decode) in encoders().items():
+        variants[name] = (encode, decode)
+        variants[f'{name}+gzip'] = with_gzip(encode, decode)
+
+    skipped = [name for name, module in (('orjson', orjson), ('msgpack', msgpack)) if module is None]
+    if skipped:
+        print(f"Not installed, skipped: {', '.join(skipped)}")
+
+    for endpoint, payload in payloads.items():
+        baseline = len(variants['json'][0](payload))
+        print(f"\n{endpoint} ({iterations} iterations)")
+        print(f"  {'encoding':<14}{'bytes':>8}{'vs json':>9}{'encode us':>11}{'decode us':>11}")
+        for name, (encode, decode) in variants.items():
+            data = encode(payload)
+            assert decode(data) == payload
+            encode_us = timeit.timeit(lambda: encode(payload), number=iterations) / iterations * 1e6
+            decode_us = timeit.timeit(lambda: decode(data), number=iterations) / iterations * 1e6
+            print(f"  {name:<14}{len(data):>8}{len(data) / baseline:>8.0%}{encode_us:>11.1f}{decode_us:>11.1f}")
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,184 @@
+"""Load generator: signed requests against a running API at a fixed concurrency
+
+Each worker thread keeps one keep-alive connection and sends requests back
+to back, cycling through the chosen endpoints, for the given duration.
+Reports throughput, errors and p50/p99/p999 latency per endpoint. Run the
+server against the simulated terminal for repeatable numbers:
+
+    GOLD_API_FAKE_MT5=1 python app.py
+    python benchmarks/load_test.py --concurrency 16 --duration 30
+
+execute_trade is only exercised with --trades; never point that at a live account.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signing import RAW_SIGNATURE_VERSION, encode_body, raw_signature
+
+API_KEY = "12345"
+API_SECRET = "mysecret123"
+
+def endpoint_payloads(symbol, trades):
+    """(method, endpoint, payload) for each endpoint under test; payload None means GET"""
+    calls = [
+        ('GET', 'status', None),
+        ('POST', 'get_price', {'symbol': symbol}),
+        ('POST', 'get_prices', {'symbols': [symbol, 'XAUEUR', 'XAGUSD']}),
+        ('POST', 'get_indicators', {'symbol': symbol}),
+        ('POST', 'get_account_info', {}),
+        ('POST', 'get_positions', {}),
+        ('POST', 'batch', {'requests': [{'endpoint': 'get_price', 'data': {'symbol': symbol}},
+                                        {'endpoint': 'get_account_info', 'data': {}},
+                                        {'endpoint': 'get_positions', 'data': {}}]}),
+    ]
+    if trades:
+        calls.append(('POST', 'execute_trade', {'symbol': symbol, 'action': 'buy', 'lot_size': 0.01}))
+        calls.append(('POST', 'execute_trade', {'symbol': symbol, 'action': 'sell', 'lot_size': 0.01}))
+    return calls
+
+def signed_request(payload):
+    """Body and headers the way the app signs them (raw-body scheme)"""
+    data = dict(payload)
+    data['timestamp'] = int(time.time() * 1000)
+    data['nonce'] = secrets.token_hex(8)
+    body = encode_body(data)
+    return body, {
+        'Content-Type': 'application/json',
+        'X-API-Key': API_KEY,
+        'X-Signature': raw_signature(API_SECRET, body),
+        'X-Signature-Version': RAW_SIGNATURE_VERSION
+    }
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class Worker(threading.Thread):
+    def __init__(self, url, calls, deadline, offset):
+        super().__init__(daemon=True)
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.prefix = parts.path.rstrip('/')
+        self.calls = calls
+        self.deadline = deadline
+        self.offset = offset
+        self.latencies = {}  # endpoint -> [seconds]
+        self.errors = {}  # endpoint -> count
+
+    def connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=30)
+
+    def run(self):
+        conn = self.connect()
+        # Workers start at different endpoints so the mix is even from the start
+        calls = itertools.islice(itertools.cycle(self.calls), self.offset, None)
+        for method, endpoint, payload in calls:
+            if time.perf_counter() >= self.deadline:
+                break
+            if payload is None:
+                body, headers = None, {}
+            else:
+                body, headers = signed_request(payload)
+
+            started = time.perf_counter()
+            try:
+                conn.request(method, f'{self.prefix}/{endpoint}', body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = self.connect()
+            elapsed = time.perf_counter() - started
+
+            if ok:
+                self.latencies.setdefault(endpoint, []).append(elapsed)
+            else:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        conn.close()
+
+def report(workers, duration):
+    latencies, errors = {}, {}
+    for worker in workers:
+        for endpoint, values in worker.latencies.items():
+            latencies.setdefault(endpoint, []).extend(values)
+        for endpoint, count in worker.errors.items():
+            errors[endpoint] = errors.get(endpoint, 0) + count
+
+    results = {}
+    all_values = []
+    print(f"{'endpoint':<18}{'ok':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'p999 ms':>10}")
+    for endpoint in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(endpoint, []))
+        all_values.extend(values)
+        results[endpoint] = summarize(values, errors.get(endpoint, 0), duration)
+        print_row(endpoint, results[endpoint])
+
+    results['total'] = summarize(sorted(all_values), sum(errors.values()), duration)
+    print_row('total', results['total'])
+    return results
+
+def summarize(ordered, errors, duration):
+    return {
+        'ok': len(ordered),
+        'errors': errors,
+        'throughput': round(len(ordered) / duration, 1),
+        'p50_ms': round(percentile(ordered, 0.5) * 1000, 2) if ordered else None,
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2) if ordered else None,
+        'p999_ms': round(percentile(ordered, 0.999) * 1000, 2) if ordered else None
+    }
+
+def print_row(name, row):
+    def ms(value):
+        return f'{value:.2f}' if value is not None else '-'
+    print(f"{name:<18}{row['ok']:>8}{row['errors']:>8}{row['throughput']:>10.1f}"
+          f"{ms(row['p50_ms']):>10}{ms(row['p99_ms']):>10}{ms(row['p999_ms']):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    parser.add_argument('--symbol', default='XAUUSD')
+    parser.add_argument('--endpoints', help='comma-separated subset, e.g. get_price,get_positions')
+    parser.add_argument('--trades', action='store_true', help='include execute_trade (buys and sells)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    calls = endpoint_payloads(args.symbol, args.trades)
+    if args.endpoints:
+        wanted = set(args.endpoints.split(','))
+        calls = [call for call in calls if call[1] in wanted]
+        if not calls:
+            parser.error(f'no known endpoints in {args.endpoints}')
+
+    print(f"{args.concurrency} workers for {args.duration}s against {args.url}: "
+          f"{', '.join(dict.fromkeys(c[1] for c in calls))}")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    workers = [Worker(args.url, calls, deadline, i) for i in range(args.concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    results = report(workers, time.perf_counter() - started)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'concurrency': args.concurrency, 'duration': args.duration, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ package.name = mykivyapp
 package.domain = org.example
 source.dir = .
 source.include_exts = py,png,jpg,kv,atlas
+source.exclude_dirs = benchmarks,tests
 version = 0.1
 requirements = python3,kivy
 orientation = portrait
@@ -0,0 +1,258 @@
+"""Simulated MetaTrader5 terminal for benchmarks and development off Windows
+
+Implements the subset of the MetaTrader5 API that app.py uses, with a
+configurable number of symbols, tick rate and per-call latency. Prices
+follow a random walk that advances tick_rate times per second of wall
+time. Start the API against it with
+
+    GOLD_API_FAKE_MT5=1 python app.py
+
+and tune it with FAKE_MT5_SYMBOLS, FAKE_MT5_TICK_RATE and FAKE_MT5_LATENCY_MS.
+"""
+import math
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+SymbolInfo = namedtuple('SymbolInfo', 'name description path visible trade_mode volume_min volume_max '
+                                      'volume_step digits bid ask')
+AccountInfo = namedtuple('AccountInfo', 'login server name balance equity margin margin_free profit '
+                                        'leverage currency')
+TerminalInfo = namedtuple('TerminalInfo', 'connected name build')
+TradePosition = namedtuple('TradePosition', 'ticket time type magic volume price_open sl tp '
+                                            'price_current profit symbol comment')
+OrderSendResult = namedtuple('OrderSendResult', 'retcode deal order volume price bid ask comment request_id')
+
+# Symbols always present, with their starting mid price and spread
+BASE_SYMBOLS = {
+    'XAUUSD': (2350.0, 0.30),
+    'XAUEUR': (2170.0, 0.45),
+    'XAGUSD': (29.5, 0.03),
+    'EURUSD': (1.0850, 0.0001),
+    'GBPUSD': (1.2700, 0.00015),
+    'USDJPY': (155.0, 0.012),
+}
+
+# Defaults, overridable through the environment
+DEFAULT_SYMBOL_COUNT = 50
+DEFAULT_TICK_RATE = 4  # price changes per symbol per second
+DEFAULT_LATENCY_MS = 1.0
+
+# Standard deviation of one tick's price move, as a fraction of the price
+TICK_VOLATILITY = 0.00005
+
+# Units per lot, used for position profit
+CONTRACT_SIZE = 100
+
+class FakeMetaTrader5:
+    """In-memory MT5 terminal; pass an instance wherever the module is expected"""
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    SYMBOL_TRADE_MODE_DISABLED = 0
+    SYMBOL_TRADE_MODE_FULL = 4
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_MARKET_CLOSED = 10018
+
+    def __init__(self, symbol_count=DEFAULT_SYMBOL_COUNT, tick_rate=DEFAULT_TICK_RATE,
+                 latency_ms=DEFAULT_LATENCY_MS, balance=10000.0, seed=None):
+        self.tick_rate = tick_rate
+        self.latency = latency_ms / 1000
+        self.balance = balance
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._last_error = (1, 'Success')
+        self._next_ticket = 1
+        self._positions = {}  # ticket -> TradePosition
+        self._symbols = {}  # name -> SymbolInfo
+        self._quotes = {}  # name -> [mid, spread, last_step, time_msc]
+
+        specs = dict(BASE_SYMBOLS)
+        for i in range(max(0, symbol_count - len(specs))):
+            specs[f'SYM{i:04d}'] = (self._random.uniform(10, 1000), 0.01)
+
+        now_ms = int(time.time() * 1000)
+        for name, (mid, spread) in list(specs.items())[:max(symbol_count, 1)]:
+            digits = 2 if mid >= 10 else 5
+            self._symbols[name] = SymbolInfo(name, f'{name} (simulated)', f'Fake\\{name}', False,
+                                             self.SYMBOL_TRADE_MODE_FULL, 0.01, 100.0, 0.01, digits,
+                                             mid - spread / 2, mid + spread / 2)
+            self._quotes[name] = [mid, spread, self._step(now_ms), now_ms]
+
+    @classmethod
+    def from_env(cls):
+        """Instance configured from FAKE_MT5_* environment variables"""
+        return cls(symbol_count=int(os.environ.get('FAKE_MT5_SYMBOLS', DEFAULT_SYMBOL_COUNT)),
+                   tick_rate=float(os.environ.get('FAKE_MT5_TICK_RATE', DEFAULT_TICK_RATE)),
+                   latency_ms=float(os.environ.get('FAKE_MT5_LATENCY_MS', DEFAULT_LATENCY_MS)))
+
+    def _delay(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _step(self, now_ms):
+        return int(now_ms * self.tick_rate / 1000) if self.tick_rate > 0 else 0
+
+    def _quote(self, name, now_ms):
+        """Advance the symbol's random walk to now; returns (bid, ask, time_msc)"""
+        quote = self._quotes[name]
+        step = self._step(now_ms)
+        if step > quote[2]:
+            moves = step - quote[2]
+            quote[0] *= math.exp(self._random.gauss(0, TICK_VOLATILITY * math.sqrt(moves)))
+            quote[2] = step
+            quote[3] = now_ms
+        mid, spread = quote[0], quote[1]
+        return mid - spread / 2, mid + spread / 2, quote[3]
+
+    def _fail(self, code, message):
+        self._last_error = (code, message)
+        return None
+
+    # Terminal
+
+    def initialize(self, *args, **kwargs):
+        self._delay()
+        self._initialized = True
+        self._last_error = (1, 'Success')
+        return True
+
+    def login(self, login, password=None, server=None, timeout=None):
+        self._delay()
+        return self._initialized
+
+    def shutdown(self):
+        self._initialized = False
+        return True
+
+    def last_error(self):
+        return self._last_error
+
+    def terminal_info(self):
+        self._delay()
+        if not self._initialized:
+            return self._fail(-10004, 'No IPC connection')
+        return TerminalInfo(True, 'Fake MetaTrader 5', 0)
+
+    def account_info(self):
+        self._delay()
+        if not self._initialized:
+            return self._fail(-10004, 'No IPC connection')
+        with self._lock:
+            profit = sum(p.profit for p in self._current_positions())
+            margin = sum(p.volume * CONTRACT_SIZE * p.price_current / 100 for p in self._positions.values())
+        equity = self.balance + profit
+        return AccountInfo(10000001, 'Fake-Server', 'Simulated Account', self.balance, equity,
+                           margin, equity - margin, profit, 100, 'USD')
+
+    # Symbols and prices
+
+    def symbols_get(self, group=None):
+        self._delay()
+        return tuple(self._symbols.values())
+
+    def symbol_select(self, symbol, enable=True):
+        self._delay()
+        if symbol not in self._symbols:
+            return self._fail(-1, f'Unknown symbol {symbol}') or False
+        self._symbols[symbol] = self._symbols[symbol]._replace(visible=enable)
+        return True
+
+    def symbol_info(self, symbol):
+        self._delay()
+        info = self._symbols.get(symbol)
+        if info is None:
+            return self._fail(-1, f'Unknown symbol {symbol}')
+        with self._lock:
+            bid, ask, _ = self._quote(symbol, int(time.time() * 1000))
+        return info._replace(bid=bid, ask=ask)
+
+    def symbol_info_tick(self, symbol):
+        self._delay()
+        if symbol not in self._symbols:
+            return self._fail(-1, f'Unknown symbol {symbol}')
+        with self._lock:
+            bid, ask, time_msc = self._quote(symbol, int(time.time() * 1000))
+        return Tick(time_msc // 1000, bid, ask, 0.0, self._random.randint(1, 50), time_msc, 6, 0.0)
+
+    # Trading
+
+    def _current_positions(self):
+        now_ms = int(time.time() * 1000)
+        positions = []
+        for pos in self._positions.values():
+            bid, ask, _ = self._quote(pos.symbol, now_ms)
+            if pos.type == self.POSITION_TYPE_BUY:
+                current, profit = bid, (bid - pos.price_open) * pos.volume * CONTRACT_SIZE
+            else:
+                current, profit = ask, (pos.price_open - ask) * pos.volume * CONTRACT_SIZE
+            positions.append(pos._replace(price_current=current, profit=round(profit, 2)))
+        return positions
+
+    def positions_get(self, symbol=None, ticket=None, group=None):
+        self._delay()
+        with self._lock:
+            positions = self._current_positions()
+        if symbol is not None:
+            positions = [p for p in positions if p.symbol == symbol]
+        if ticket is not None:
+            positions = [p for p in positions if p.ticket == ticket]
+        return tuple(positions)
+
+    def positions_total(self):
+        return len(self._positions)
+
+    def order_send(self, request):
+        """Fill a market deal, netting it against opposite positions oldest first"""
+        self._delay()
+        symbol = request.get('symbol')
+        volume = request.get('volume', 0)
+        order_type = request.get('type')
+        if symbol not in self._symbols or order_type not in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL):
+            return OrderSendResult(self.TRADE_RETCODE_INVALID, 0, 0, 0.0, 0.0, 0.0, 0.0, 'Invalid request', 0)
+        if volume <= 0:
+            return OrderSendResult(self.TRADE_RETCODE_INVALID_VOLUME, 0, 0, 0.0, 0.0, 0.0, 0.0, 'Invalid volume', 0)
+
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            bid, ask, _ = self._quote(symbol, now_ms)
+            price = ask if order_type == self.ORDER_TYPE_BUY else bid
+            ticket = self._next_ticket
+            self._next_ticket += 1
+
+            opposite = self.POSITION_TYPE_SELL if order_type == self.ORDER_TYPE_BUY else self.POSITION_TYPE_BUY
+            remaining = volume
+            for pos in sorted(self._positions.values(), key=lambda p: p.ticket):
+                if remaining <= 0:
+                    break
+                if pos.symbol != symbol or pos.type != opposite:
+                    continue
+                closed = min(pos.volume, remaining)
+                sign = 1 if pos.type == self.POSITION_TYPE_BUY else -1
+                self.balance += round((price - pos.price_open) * sign * closed * CONTRACT_SIZE, 2)
+                remaining = round(remaining - closed, 8)
+                if closed >= pos.volume:
+                    del self._positions[pos.ticket]
+                else:
+                    self._positions[pos.ticket] = pos._replace(volume=round(pos.volume - closed, 8))
+
+            if remaining > 0:
+                self._positions[ticket] = TradePosition(
+                    ticket, now_ms // 1000, order_type, request.get('magic', 0), remaining, price,
+                    request.get('sl', 0.0), request.get('tp', 0.0), price, 0.0, symbol,
+                    request.get('comment', ''))
+
+        return OrderSendResult(self.TRADE_RETCODE_DONE, ticket, ticket, volume, price, bid, ask,
+                               'Request executed', 0)
@@ -1,5 +1,7 @@
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
@@ -8,11 +10,536 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.clock import Clock
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Line
 import threading
-import hashlib
-import hmac
+import itertools
+import queue
+import secrets
 import time
 import socket
+import os
+from collections import deque
+from async_logging import get_logger
+from signing import RAW_SIGNATURE_VERSION, encode_body, raw_signature
+
+logger = get_logger('gold_app')
+
+# Optional; with it the server answers in MessagePack instead of JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Accept header for API calls; gzip is negotiated and undone by requests itself
+RESPONSE_ACCEPT = f'{MSGPACK_MIMETYPE}, application/json;q=0.9' if msgpack is not None else 'application/json'
+
+def decode_response(response):
+    """Parsed body of a JSON or MessagePack response"""
+    if msgpack is not None and response.headers.get('Content-Type', '').startswith(MSGPACK_MIMETYPE):
+        return msgpack.unpackb(response.content, raw=False, strict_map_key=False)
+    return response.json()
+
+def response_text(response):
+    """Body as text for logs and error messages, whatever its encoding"""
+    if response.headers.get('Content-Type', '').startswith(MSGPACK_MIMETYPE):
+        try:
+            return json.dumps(decode_response(response))
+        except Exception:
+            return repr(response.content[:200])
+    return response.text
+
+# Read timeout for the price stream; the server sends a heartbeat every 15 s
+PRICE_STREAM_READ_TIMEOUT = 45
+
+# Per-endpoint request timeouts (seconds); other endpoints use DEFAULT_TIMEOUT
+ENDPOINT_TIMEOUTS = {
+    'status': 5,
+    'get_price': 5,
+    'detect_gold_symbol': 15,
+    'execute_trade': 15,
+    'submit_order': 5,
+    'order_status': 5,
+}
+DEFAULT_TIMEOUT = 10
+
+# Keep-alive connections kept open to the server
+HTTP_POOL_SIZE = 4
+
+# Set by the pool when the current thread's request had to open a new connection
+_connection_events = threading.local()
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _connection_events.opened = True
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _connection_events.opened = True
+        return super()._new_conn()
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+# Round-trip samples kept per endpoint for the latency percentiles
+LATENCY_SAMPLES = 200
+
+# The clock offset comes from the fastest of this many recent round trips
+CLOCK_SAMPLES = 16
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted sequence"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class ClockOffset:
+    """Estimates server clock minus local clock from X-Server-Time headers
+    
+    The server stamps its time somewhere within the round trip, so each
+    sample is off by at most half its RTT; the fastest recent sample wins.
+    """
+    
+    def __init__(self, samples=CLOCK_SAMPLES):
+        self._samples = deque(maxlen=samples)  # (rtt_ms, offset_ms)
+        self._lock = threading.Lock()
+        self.offset_ms = 0
+    
+    def add_sample(self, sent_ms, received_ms, server_ms):
+        rtt = received_ms - sent_ms
+        offset = server_ms - (sent_ms + received_ms) / 2
+        with self._lock:
+            self._samples.append((rtt, offset))
+            self.offset_ms = int(min(self._samples)[1])
+    
+    def now_ms(self):
+        """Current time in milliseconds on the server's clock"""
+        return int(time.time() * 1000) + self.offset_ms
+    
+    def summary(self):
+        with self._lock:
+            best_rtt = min(self._samples)[0] if self._samples else None
+            return {
+                'offset_ms': self.offset_ms,
+                'best_rtt_ms': round(best_rtt, 1) if best_rtt is not None else None,
+                'samples': len(self._samples)
+            }
+
+class ApiSession:
+    """Shared keep-alive HTTP session for all calls to the Flask API
+    
+    Also records, per endpoint, how many requests reused a pooled
+    connection, how long reused and new-connection requests took and
+    recent round-trip times, and feeds server timestamps to self.clock.
+    """
+    
+    def __init__(self, base_url, headers, pool_size=HTTP_POOL_SIZE):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = _CountingAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.clock = ClockOffset()
+    
+    def request(self, method, endpoint, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        
+        _connection_events.opened = False
+        sent_ms = time.time() * 1000
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}/{endpoint}", timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record_error(endpoint)
+            raise
+        self._record(endpoint, time.perf_counter() - started, _connection_events.opened)
+        
+        server_time = response.headers.get('X-Server-Time')
+        if server_time:
+            try:
+                self.clock.add_sample(sent_ms, time.time() * 1000, int(server_time))
+            except ValueError:
+                pass
+        return response
+    
+    def get(self, endpoint, **kwargs):
+        return self.request('GET', endpoint, **kwargs)
+    
+    def post(self, endpoint, **kwargs):
+        return self.request('POST', endpoint, **kwargs)
+    
+    def _endpoint_stats(self, endpoint):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {'requests': 0, 'new_connections': 0, 'errors': 0,
+                                             'new_time': 0.0, 'reused_time': 0.0,
+                                             'samples': deque(maxlen=LATENCY_SAMPLES)}
+        return stats
+    
+    def _record(self, endpoint, elapsed, new_connection):
+        with self._lock:
+            stats = self._endpoint_stats(endpoint)
+            stats['requests'] += 1
+            stats['samples'].append(elapsed * 1000)
+            if new_connection:
+                stats['new_connections'] += 1
+                stats['new_time'] += elapsed
+            else:
+                stats['reused_time'] += elapsed
+    
+    def _record_error(self, endpoint):
+        with self._lock:
+            self._endpoint_stats(endpoint)['errors'] += 1
+    
+    def latency_summary(self):
+        """Per-endpoint p50/p99 round-trip time over the recent samples"""
+        with self._lock:
+            samples = {endpoint: list(stats['samples']) for endpoint, stats in self._stats.items()}
+            errors = {endpoint: stats['errors'] for endpoint, stats in self._stats.items()}
+        
+        summary = {}
+        for endpoint, values in samples.items():
+            summary[endpoint] = {
+                'samples': len(values),
+                'errors': errors[endpoint],
+                'p50_ms': round(percentile(values, 0.5), 1) if values else None,
+                'p99_ms': round(percentile(values, 0.99), 1) if values else None
+            }
+        return summary
+    
+    def diagnostics(self):
+        """Everything recorded about the connection, for export"""
+        return {
+            'base_url': self.base_url,
+            'latency': self.latency_summary(),
+            'connections': self.connection_stats(),
+            'clock': self.clock.summary(),
+            'latency_samples_ms': self.latency_samples()
+        }
+    
+    def latency_samples(self):
+        with self._lock:
+            return {endpoint: [round(ms, 1) for ms in stats['samples']] for endpoint, stats in self._stats.items()}
+    
+    def connection_stats(self):
+        """Per-endpoint connection reuse and latency summary"""
+        summary = {}
+        with self._lock:
+            for endpoint, stats in self._stats.items():
+                new = stats['new_connections']
+                reused = stats['requests'] - new
+                avg_new_ms = stats['new_time'] / new * 1000 if new else None
+                avg_reused_ms = stats['reused_time'] / reused * 1000 if reused else None
+                saved_ms = None
+                if avg_new_ms is not None and avg_reused_ms is not None:
+                    saved_ms = round(reused * (avg_new_ms - avg_reused_ms), 1)
+                summary[endpoint] = {
+                    'requests': stats['requests'],
+                    'reused': reused,
+                    'avg_new_ms': round(avg_new_ms, 1) if avg_new_ms is not None else None,
+                    'avg_reused_ms': round(avg_reused_ms, 1) if avg_reused_ms is not None else None,
+                    'saved_ms': saved_ms
+                }
+        return summary
+    
+    def close(self):
+        self.session.close()
+
+# Price poll intervals (seconds)
+POLL_INTERVAL_DEFAULT = 3
+POLL_INTERVAL_FAST = 0.5
+POLL_INTERVAL_MARKET_CLOSED = 30
+POLL_INTERVAL_PAUSED = 60
+
+# Bounds applied to the server's suggested interval (seconds)
+POLL_INTERVAL_MIN = 0.5
+POLL_INTERVAL_MAX = 60
+
+# How long polling stays fast after order-entry activity (seconds)
+FAST_POLL_DURATION = 10
+
+class PollScheduler:
+    """Picks the next price poll interval from app, market and server state"""
+    
+    def __init__(self):
+        self.paused = False
+        self.market_closed = False
+        self.server_hint = None
+        self._fast_until = 0
+    
+    def boost(self, duration=FAST_POLL_DURATION):
+        """Poll fast for a while, e.g. when the user is about to trade"""
+        self._fast_until = time.monotonic() + duration
+    
+    def next_interval(self):
+        if self.paused:
+            return POLL_INTERVAL_PAUSED
+        if time.monotonic() < self._fast_until:
+            return POLL_INTERVAL_FAST
+        if self.market_closed:
+            return POLL_INTERVAL_MARKET_CLOSED
+        if self.server_hint is not None:
+            return min(max(self.server_hint, POLL_INTERVAL_MIN), POLL_INTERVAL_MAX)
+        return POLL_INTERVAL_DEFAULT
+
+def is_market_closed_error(message):
+    message = message.lower()
+    return 'market' in message and 'closed' in message
+
+def is_retryable_error(message):
+    """True for transport failures and overload, where resending the same request is safe"""
+    return bool(message) and message.startswith(('Request timeout', 'Network error',
+                                                 'Flask server not running', 'API returned status 503'))
+
+# Attempts to hand an order to the server; every attempt reuses the tap's idempotency key
+ORDER_SUBMIT_ATTEMPTS = 3
+
+# Accepted orders are checked this often (seconds) until filled or ORDER_FILL_TIMEOUT passes
+ORDER_STATUS_POLL_INTERVAL = 0.5
+ORDER_FILL_TIMEOUT = 30
+
+# Prices kept by the intraday chart
+CHART_CAPACITY = 5000
+
+# Recent prices requested from the server to seed the chart
+CHART_HISTORY_POINTS = 1000
+
+# Min/max buckets the chart keeps; past this, neighbouring buckets are merged
+# in pairs, leaving at least half as many, still about a phone screen's width
+CHART_MAX_BUCKETS = 2048
+
+class PriceChart(Widget):
+    """Intraday sparkline drawn with one Line instruction updated in place
+    
+    add_price() folds each price into a running [low, high, count] bucket,
+    so only up to CHART_MAX_BUCKETS buckets are kept whatever the number of
+    prices. Redraws are coalesced to one per frame and reduce the buckets
+    to a min/max pair per horizontal pixel, so drawing cost follows the
+    widget width, not the number of prices.
+    """
+    
+    def __init__(self, capacity=CHART_CAPACITY, max_buckets=CHART_MAX_BUCKETS, **kwargs):
+        super().__init__(**kwargs)
+        self.capacity = capacity
+        self.max_buckets = max_buckets
+        self._buckets = deque()  # [low, high, count], oldest first
+        self._bucket_size = 1
+        self._count = 0
+        with self.canvas:
+            Color(1, 0.84, 0, 1)
+            self._line = Line(points=[], width=1.2)
+        self._redraw = Clock.create_trigger(self._update_line)
+        self.bind(pos=self._redraw, size=self._redraw)
+    
+    def add_price(self, price):
+        buckets = self._buckets
+        if buckets and buckets[-1][2] < self._bucket_size:
+            last = buckets[-1]
+            last[0] = min(last[0], price)
+            last[1] = max(last[1], price)
+            last[2] += 1
+        else:
+            buckets.append([price, price, 1])
+        self._count += 1
+        
+        # Oldest prices leave a whole bucket at a time
+        while self._count > self.capacity:
+            self._count -= buckets.popleft()[2]
+        if len(buckets) > self.max_buckets:
+            self._merge_buckets()
+        self._redraw()
+    
+    def _merge_buckets(self):
+        merged = deque()
+        pairs = iter(self._buckets)
+        for first in pairs:
+            second = next(pairs, None)
+            if second is not None:
+                first = [min(first[0], second[0]), max(first[1], second[1]), first[2] + second[2]]
+            merged.append(first)
+        self._buckets = merged
+        self._bucket_size *= 2
+    
+    def set_prices(self, prices):
+        """Replace the chart contents, e.g. with history from the server"""
+        self._reset()
+        for price in prices[-self.capacity:]:
+            self.add_price(price)
+    
+    def clear(self):
+        self._reset()
+        self._redraw()
+    
+    def _reset(self):
+        self._buckets = deque()
+        self._bucket_size = 1
+        self._count = 0
+    
+    def _update_line(self, *args):
+        buckets = list(self._buckets)
+        if self._count < 2 or self.width < 2:
+            self._line.points = []
+            return
+        
+        low = min(bucket[0] for bucket in buckets)
+        high = max(bucket[1] for bucket in buckets)
+        span = (high - low) or 1.0
+        x0, y0 = self.pos
+        width, height = self.size
+        
+        columns = min(len(buckets), int(width))
+        step = len(buckets) / columns
+        x_scale = width / max(columns - 1, 1)
+        y_scale = height / span
+        
+        points = []
+        for c in range(columns):
+            chunk = buckets[int(c * step):int((c + 1) * step)]
+            x = x0 + c * x_scale
+            chunk_low = min(bucket[0] for bucket in chunk)
+            chunk_high = max(bucket[1] for bucket in chunk)
+            points.append(x)
+            points.append(y0 + (chunk_low - low) * y_scale)
+            if chunk_high != chunk_low:
+                points.append(x)
+                points.append(y0 + (chunk_high - low) * y_scale)
+        self._line.points = points
+
+class UIState:
+    """Display values set from any thread and flushed to widgets once per frame
+    
+    Setting a field to the value it already has is a no-op; changed fields
+    are marked dirty and a single Clock trigger renders just those on the
+    next frame, however many updates arrived in between.
+    """
+    
+    def __init__(self, render):
+        self.render = render
+        self._values = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._trigger = Clock.create_trigger(self.flush)
+    
+    def set(self, field, value):
+        with self._lock:
+            if field in self._values and self._values[field] == value:
+                return
+            self._values[field] = value
+            self._dirty.add(field)
+        self._trigger()
+    
+    def flush(self, dt=None):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            changes = [(field, self._values[field]) for field in dirty]
+        for field, value in changes:
+            self.render(field, value)
+
+# Background threads shared by all client network calls
+NETWORK_WORKERS = 3
+
+# Job priorities: lower runs first, so trades go ahead of polls
+PRIORITY_TRADE = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_POLL = 2
+
+class NetworkWorkerPool:
+    """Fixed set of worker threads running network jobs in priority order
+    
+    Jobs submitted with a key are dropped while another job with the same
+    key is queued or running, so slow responses cannot stack up polls.
+    """
+    
+    def __init__(self, workers=NETWORK_WORKERS):
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"network-worker-{i}", daemon=True).start()
+    
+    def submit(self, fn, priority=PRIORITY_POLL, key=None):
+        """Queue fn; returns False if it was coalesced into an in-flight job"""
+        if key is not None:
+            with self._lock:
+                if key in self._in_flight:
+                    return False
+                self._in_flight.add(key)
+        self._queue.put((priority, next(self._order), fn, key))
+        return True
+    
+    def _run(self):
+        while True:
+            _, _, fn, key = self._queue.get()
+            try:
+                fn()
+            except Exception as e:
+                logger.error("Background task error: %s", e)
+            finally:
+                if key is not None:
+                    with self._lock:
+                        self._in_flight.discard(key)
+
+# Calls made within this window of each other are sent as one /api/batch request
+BATCH_WINDOW = 0.02
+
+# Endpoints the server accepts inside /api/batch
+BATCHABLE_ENDPOINTS = ('get_price', 'get_prices', 'get_indicators', 'get_account_info', 'get_positions')
+
+class RequestBatcher:
+    """Coalesces concurrent API calls into a single batch round trip"""
+    
+    def __init__(self, send_batch, window=BATCH_WINDOW):
+        self.send_batch = send_batch
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = None
+    
+    def submit(self, calls):
+        """Queue (endpoint, data) calls and block until the batch carrying them returns"""
+        entry = {'calls': list(calls), 'done': threading.Event(), 'results': None}
+        with self._lock:
+            is_leader = self._pending is None
+            if is_leader:
+                self._pending = []
+            self._pending.append(entry)
+        
+        if not is_leader:
+            entry['done'].wait()
+            return entry['results']
+        
+        # The first caller waits briefly for others, then sends for everyone
+        time.sleep(self.window)
+        with self._lock:
+            entries, self._pending = self._pending, None
+        
+        all_calls = [call for e in entries for call in e['calls']]
+        try:
+            results = self.send_batch(all_calls)
+        except Exception as e:
+            results = [{'error': f'Unexpected error: {str(e)}'} for _ in all_calls]
+        
+        offset = 0
+        for e in entries:
+            e['results'] = results[offset:offset + len(e['calls'])]
+            offset += len(e['calls'])
+            e['done'].set()
+        return entry['results']
+
+# Latency overlay height when shown (pixels) and refresh period (seconds)
+LATENCY_OVERLAY_HEIGHT = 120
+LATENCY_OVERLAY_INTERVAL = 1
 
 class GoldTradingApp(App):
     def __init__(self):
@@ -26,11 +553,48 @@ class GoldTradingApp(App):
         self.current_price = 0.0
         self.balance = 10000.0  # Demo balance
         self.position = 0.0
+        self.positions = {}  # ticket -> position, kept current with delta responses
+        self.positions_version = None
+        self.positions_epoch = None
         self.symbol = None  # Will be auto-detected
         self.available_symbols = []  # Store available symbols
         self.market_closed_shown = False  # Track if market closed popup was shown
         self.symbol_detected = False  # Track if symbol was successfully detected
         
+        # Server-pushed price stream; update_price polling is the fallback
+        self.use_price_stream = True
+        self.price_stream_active = False
+        self.last_price_seq = 0
+        self._price_stream_stop = None
+        
+        # One pooled keep-alive session; the API key header is set once here
+        self.http = ApiSession(self.api_base_url, {
+            'Content-Type': 'application/json',
+            'X-API-Key': self.api_key
+        })
+        
+        # All one-off network calls run on this pool instead of fresh threads
+        self.workers = NetworkWorkerPool()
+        
+        # Price polls are rescheduled after each one from the scheduler's interval
+        self.poll_scheduler = PollScheduler()
+        self._poll_event = None
+        
+        # Label updates are coalesced and applied once per frame
+        self.ui_state = UIState(self.render_ui_field)
+        
+        # Concurrent calls to batchable endpoints share one round trip
+        self.batcher = RequestBatcher(self.make_batch_request)
+        
+        # Latency overlay refresh; None while the overlay is hidden
+        self._latency_event = None
+        
+        # ETag of the last full response per endpoint, sent back as if_none_match
+        self.etags = {}
+        
+        # Action of the order being submitted; further taps are ignored until the server acknowledges it
+        self.pending_trade = None
+        
     def build(self):
         main_layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
         
@@ -49,6 +613,10 @@ class GoldTradingApp(App):
                                size_hint_y=None, height=40, font_size=18)
         main_layout.add_widget(self.price_label)
         
+        # Intraday price chart
+        self.price_chart = PriceChart(size_hint_y=None, height=150)
+        main_layout.add_widget(self.price_chart)
+        
         # Account info
         account_layout = GridLayout(cols=2, size_hint_y=None, height=80, spacing=5)
         
@@ -63,6 +631,7 @@ class GoldTradingApp(App):
         lot_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
         lot_layout.add_widget(Label(text='Lot Size:', size_hint_x=0.3))
         self.lot_input = TextInput(text='0.01', multiline=False, size_hint_x=0.7)
+        self.lot_input.bind(focus=self.on_lot_input_focus)
         lot_layout.add_widget(self.lot_input)
         main_layout.add_widget(lot_layout)
         
@@ -87,6 +656,20 @@ class GoldTradingApp(App):
         refresh_button.bind(on_press=self.refresh_connection)
         main_layout.add_widget(refresh_button)
         
+        # Latency overlay and diagnostics export
+        debug_layout = GridLayout(cols=2, size_hint_y=None, height=40, spacing=10)
+        latency_button = Button(text='Latency', font_size=14)
+        latency_button.bind(on_press=self.toggle_latency_overlay)
+        export_button = Button(text='Export Diagnostics', font_size=14)
+        export_button.bind(on_press=self.export_diagnostics)
+        debug_layout.add_widget(latency_button)
+        debug_layout.add_widget(export_button)
+        main_layout.add_widget(debug_layout)
+        
+        # Hidden (zero height) until the Latency button is pressed
+        self.latency_label = Label(text='', size_hint_y=None, height=0, opacity=0, font_size=12)
+        main_layout.add_widget(self.latency_label)
+        
         # Status label
         self.status_label = Label(text='Connecting to server...', size_hint_y=None, height=40)
         main_layout.add_widget(self.status_label)
@@ -95,7 +678,7 @@ class GoldTradingApp(App):
         Clock.schedule_once(self.check_initial_connection, 1)
         
         # Start price updates (will only work after symbol is detected)
-        Clock.schedule_interval(self.update_price, 3)  # Update every 3 seconds
+        self.schedule_next_poll(POLL_INTERVAL_DEFAULT)
         
         return main_layout
     
@@ -116,15 +699,15 @@ class GoldTradingApp(App):
                                   "Cannot connect to Flask server. Please ensure it is running at 92.118.46.58:5000.")
                 Clock.schedule_once(update_status_offline, 0)
         
-        threading.Thread(target=check_connection, daemon=True).start()
+        self.workers.submit(check_connection, PRIORITY_ACCOUNT, key='check_connection')
     
     def detect_gold_symbol(self):
         """Detect the correct gold symbol from the server"""
         def detect_symbol():
             try:
                 # First, check server status
-                response = requests.get(f"{self.api_base_url}/status", timeout=10)
-                print(f"Status response: {response.status_code} - {response.text}")
+                response = self.http.get('status', timeout=10)
+                logger.debug("Status response: %s - %s", response.status_code, response.text)
                 if response.status_code == 200:
                     data = response.json()
                     detected_symbol = data.get('detected_gold_symbol')
@@ -138,19 +721,13 @@ class GoldTradingApp(App):
                         return
                 
                 # If no symbol detected, try to trigger detection with authentication
-                headers = {
-                    'Content-Type': 'application/json',
-                    'X-API-Key': self.api_key,
-                    'X-Signature': self.generate_signature({'timestamp': int(time.time() * 1000)})
-                }
+                body, headers = self.sign_request({})
                 
                 # Ensure POST request for detect_gold_symbol
-                payload = {'timestamp': int(time.time() * 1000)}
-                response = requests.post(f"{self.api_base_url}/detect_gold_symbol", 
-                                      json=payload, headers=headers, timeout=15)
+                response = self.http.post('detect_gold_symbol', data=body, headers=headers)
                 
-                print(f"Detection response status: {response.status_code}")
-                print(f"Detection response: {response.text}")
+                logger.info("Detection response status: %s", response.status_code)
+                logger.debug("Detection response: %s", response.text)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -182,7 +759,7 @@ class GoldTradingApp(App):
                     Clock.schedule_once(update_status_failed, 0)
                     
             except requests.exceptions.RequestException as e:
-                print(f"Symbol detection error: {e}")
+                logger.error("Symbol detection error: %s", e)
                 error_msg = str(e)
                 def update_status_error(dt):
                     self.update_status(f"Symbol detection failed: {error_msg}")
@@ -190,15 +767,17 @@ class GoldTradingApp(App):
                                   f"Network error during symbol detection: {error_msg}")
                 Clock.schedule_once(update_status_error, 0)
         
-        threading.Thread(target=detect_symbol, daemon=True).start()
+        self.workers.submit(detect_symbol, PRIORITY_ACCOUNT, key='detect_symbol')
     
     def on_symbol_detected(self, symbol):
         """Called when gold symbol is successfully detected"""
-        self.symbol_label.text = f'Gold Symbol: {symbol}'
+        self.ui_state.set('symbol', symbol)
         self.update_status("Gold symbol detected - Ready to trade")
         self.buy_button.disabled = False
         self.sell_button.disabled = False
         self.fetch_account_info()
+        self.load_chart_history()
+        self.start_price_stream()
     
     def show_symbol_selection(self, possible_symbols):
         """Show popup for manual symbol selection"""
@@ -249,139 +828,366 @@ class GoldTradingApp(App):
         if hasattr(self, 'symbol_popup'):
             self.symbol_popup.dismiss()
         
-        threading.Thread(target=set_symbol, daemon=True).start()
+        self.workers.submit(set_symbol, PRIORITY_ACCOUNT)
     
     def on_manual_symbol_set(self, symbol):
         """Called when symbol is manually set successfully"""
-        self.symbol_label.text = f'Gold Symbol: {symbol}'
+        self.ui_state.set('symbol', symbol)
         self.update_status(f"Symbol set to {symbol} - Ready to trade")
         self.buy_button.disabled = False
         self.sell_button.disabled = False
         self.fetch_account_info()
+        self.load_chart_history()
+        self.start_price_stream()
     
     def refresh_connection(self, instance):
         """Refresh connection and re-detect symbol"""
+        self.stop_price_stream()
+        self.positions_version = None
+        self.etags.clear()
         self.symbol = None
         self.symbol_detected = False
         self.buy_button.disabled = True
         self.sell_button.disabled = True
-        self.symbol_label.text = 'Detecting gold symbol...'
+        self.ui_state.set('symbol', None)
         self.update_status('Refreshing connection...')
         Clock.schedule_once(self.check_initial_connection, 0.5)
     
+    def load_chart_history(self):
+        """Seed the chart with the server's recent tick history"""
+        self.price_chart.clear()
+        
+        def fetch_history():
+            response = self.make_secure_request('get_indicators', {'points': CHART_HISTORY_POINTS})
+            prices = response.get('history', {}).get('price', []) if response else []
+            if prices:
+                def set_chart_prices(dt):
+                    self.price_chart.set_prices(prices)
+                Clock.schedule_once(set_chart_prices, 0)
+        
+        self.workers.submit(fetch_history, PRIORITY_POLL, key='chart_history')
+    
     def fetch_account_info(self):
         """Fetch real account info from MT5"""
         def fetch_info():
             try:
-                response = self.make_secure_request('get_account_info')
-                if response and response.get('success'):
+                # Account and positions come back together in one round trip
+                positions_request = {}
+                if self.positions_version is not None:
+                    positions_request = {'since_version': self.positions_version,
+                                         'epoch': self.positions_epoch}
+                response, pos_response = self.batcher.submit([
+                    ('get_account_info', self.conditional_request('get_account_info', {})),
+                    ('get_positions', self.conditional_request('get_positions', positions_request))
+                ])
+                
+                # Unchanged state comes back as a bodiless not_modified; nothing to apply or redraw
+                if self.is_modified('get_account_info', response):
                     self.balance = response.get('balance', self.balance)
-                    def update_ui_callback(dt):
-                        self.update_ui()
-                    Clock.schedule_once(update_ui_callback, 0)
+                    self.ui_state.set('balance', self.balance)
                     
-                # Also fetch current positions
-                pos_response = self.make_secure_request('get_positions')
-                if pos_response and pos_response.get('success'):
-                    gold_positions = pos_response.get('gold_positions', [])
-                    total_volume = sum(pos['volume'] if pos['type'] == 'buy' else -pos['volume'] 
-                                     for pos in gold_positions)
-                    self.position = total_volume
-                    def update_ui_callback2(dt):
-                        self.update_ui()
-                    Clock.schedule_once(update_ui_callback2, 0)
+                if self.is_modified('get_positions', pos_response):
+                    self.apply_positions(pos_response)
+                    self.ui_state.set('position', self.position)
                     
             except Exception as e:
-                print(f"Error fetching account info: {e}")
-        
-        threading.Thread(target=fetch_info, daemon=True).start()
-    
-    def generate_signature(self, data):
-        """Generate HMAC signature for secure API requests"""
-        message = json.dumps(data, sort_keys=True)
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
-    
-    def make_secure_request(self, endpoint, data=None):
-        """Make secure API request with authentication"""
-        if data is None:
-            data = {}
+                logger.error("Error fetching account info: %s", e)
         
-        # Add timestamp for replay attack prevention
-        data['timestamp'] = int(time.time() * 1000)
+        self.workers.submit(fetch_info, PRIORITY_ACCOUNT, key='account_info')
+    
+    def conditional_request(self, endpoint, data):
+        """Add the ETag of the last full response, so an unchanged one is answered not_modified"""
+        etag = self.etags.get(endpoint)
+        if etag:
+            data = dict(data, if_none_match=etag)
+        return data
+    
+    def is_modified(self, endpoint, response):
+        """True for a successful response with new content; remembers its ETag"""
+        if not response or not response.get('success') or response.get('not_modified'):
+            return False
+        if response.get('etag'):
+            self.etags[endpoint] = response['etag']
+        return True
+    
+    def apply_positions(self, response):
+        """Merge a full or delta get_positions response into self.positions"""
+        if response.get('delta'):
+            for pos in response.get('opened', []) + response.get('changed', []):
+                self.positions[pos['ticket']] = pos
+            for ticket in response.get('closed', []):
+                self.positions.pop(ticket, None)
+        else:
+            self.positions = {pos['ticket']: pos for pos in response.get('all_positions', [])}
         
+        self.positions_version = response.get('version')
+        self.positions_epoch = response.get('epoch')
+        
+        # Net exposure is aggregated by the server
+        exposure = response.get('exposure', {}).get(self.symbol)
+        self.position = exposure['net_volume'] if exposure else 0.0
+    
+    def sign_request(self, data):
+        """Timestamp data, serialize it once and sign those exact bytes
+        
+        Returns (body, headers); the body must be sent unchanged.
+        """
+        # Add timestamp and nonce for replay attack prevention; the timestamp
+        # is on the server's clock so a drifting phone clock is not rejected
+        data['timestamp'] = self.http.clock.now_ms()
+        data['nonce'] = secrets.token_hex(8)
+        body = encode_body(data)
+        
+        # Content-Type and X-API-Key are default headers on self.http
         headers = {
-            'Content-Type': 'application/json',
-            'X-API-Key': self.api_key,
-            'X-Signature': self.generate_signature(data)
+            'X-Signature': raw_signature(self.api_secret, body),
+            'X-Signature-Version': RAW_SIGNATURE_VERSION
         }
+        return body, headers
+    
+    def make_batch_request(self, calls):
+        """Send several (endpoint, data) calls in one signed /api/batch request"""
+        if len(calls) == 1:
+            endpoint, data = calls[0]
+            return [self.make_secure_request(endpoint, data)]
+        
+        response = self.make_secure_request('batch', {
+            'requests': [{'endpoint': endpoint, 'data': data or {}} for endpoint, data in calls]
+        })
+        
+        if 'results' not in response:
+            if 'status 404' in response.get('error', ''):
+                # Older server without /api/batch
+                return [self.make_secure_request(endpoint, data) for endpoint, data in calls]
+            return [dict(response) for _ in calls]
+        
+        results = []
+        for result in response['results']:
+            if result.get('status') in (200, 304):
+                results.append(result.get('body', {}))
+            else:
+                results.append({'error': f"API returned status {result.get('status')}: {json.dumps(result.get('body'))}"})
+        return results
+    
+    def make_secure_request(self, endpoint, data=None, batch=False):
+        """Make secure API request with authentication
+        
+        With batch=True, calls made at the same time as other batchable
+        calls are combined into a single /api/batch round trip.
+        """
+        if data is None:
+            data = {}
+        
+        if batch and endpoint in BATCHABLE_ENDPOINTS:
+            return self.batcher.submit([(endpoint, data)])[0]
+        
+        body, headers = self.sign_request(data)
         
         try:
             url = f"{self.api_base_url}/{endpoint}"
-            print(f"Making request to: {url} with data: {data}")
+            # Payloads are only logged at DEBUG, and truncated
+            logger.debug("Making request to: %s with data: %s", url, data)
+            
+            headers['Accept'] = RESPONSE_ACCEPT
+            response = self.http.post(endpoint, data=body, headers=headers)
             
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            if response.status_code == 401 and 'Request too old' in response_text(response):
+                # The rejection carried the server time, so a re-signed request uses the corrected offset
+                logger.info("Timestamp rejected by %s, retrying with clock offset %s ms", endpoint, self.http.clock.offset_ms)
+                body, headers = self.sign_request(data)
+                headers['Accept'] = RESPONSE_ACCEPT
+                response = self.http.post(endpoint, data=body, headers=headers)
             
-            print(f"Response status: {response.status_code}")
-            print(f"Response text: {response.text}")
+            logger.debug("Response status: %s (%s, %s bytes)", response.status_code,
+                         response.headers.get('Content-Type'), response.headers.get('Content-Length'))
             
-            if response.status_code == 200:
-                return response.json()
+            if response.status_code == 304:
+                return {'success': True, 'not_modified': True, 'etag': response.headers.get('ETag', '').strip('"')}
+            
+            if 200 <= response.status_code < 300:
+                payload = decode_response(response)
+                logger.debug("Response body: %s", payload)
+                return payload
             else:
-                print(f"API error: {response.text}")
-                return {'error': f'API returned status {response.status_code}: {response.text}'}
+                text = response_text(response)
+                logger.warning("API error from %s: %s", endpoint, text)
+                return {'error': f'API returned status {response.status_code}: {text}'}
                 
         except requests.exceptions.ConnectionError:
-            print("Connection error: Flask server not running")
+            logger.warning("Connection error: Flask server not running")
             return {'error': 'Flask server not running. Please start the Flask API server first.'}
         except requests.exceptions.Timeout:
-            print("Request timeout")
+            logger.warning("Request timeout: %s", endpoint)
             return {'error': 'Request timeout. Server may be overloaded.'}
         except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
+            logger.warning("Request error: %s", e)
             return {'error': f'Network error: {str(e)}'}
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
             return {'error': f'Unexpected error: {str(e)}'}
     
     def check_server_connection(self):
         """Check if Flask server is running"""
         try:
-            response = requests.get(f"{self.api_base_url}/status", timeout=5)
-            print(f"Server status check: {response.status_code}")
+            response = self.http.get('status')
+            logger.info("Server status check: %s", response.status_code)
             return response.status_code == 200
         except Exception as e:
-            print(f"Server connection check failed: {e}")
+            logger.warning("Server connection check failed: %s", e)
             return False
     
+    def start_price_stream(self):
+        """Subscribe to server-pushed price changes for the current symbol"""
+        if not self.use_price_stream or not self.symbol:
+            return
+        
+        self.stop_price_stream()
+        stop_event = threading.Event()
+        self._price_stream_stop = stop_event
+        self.last_price_seq = 0
+        symbol = self.symbol
+        
+        def stream_thread():
+            backoff = 1
+            while not stop_event.is_set():
+                data = {'symbol': symbol, 'last_seq': self.last_price_seq}
+                body, headers = self.sign_request(data)
+                try:
+                    with self.http.post('stream_price', data=body, headers=headers,
+                                        stream=True, timeout=(5, PRICE_STREAM_READ_TIMEOUT)) as response:
+                        if response.status_code == 404:
+                            logger.info("Price stream not supported by server - using polling")
+                            return
+                        if response.status_code == 503:
+                            # Server is at its stream limit; poll and try again later
+                            logger.info("Price stream limit reached on server - polling for now")
+                            backoff = 30
+                        elif response.status_code != 200:
+                            logger.warning("Price stream error: %s - %s", response.status_code, response.text)
+                        else:
+                            self.price_stream_active = True
+                            backoff = 1
+                            self.consume_price_stream(response, stop_event)
+                except requests.exceptions.RequestException as e:
+                    logger.info("Price stream disconnected: %s", e)
+                finally:
+                    if self._price_stream_stop is stop_event:
+                        self.price_stream_active = False
+                
+                # Polling covers the gap while we wait to reconnect
+                stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30)
+        
+        # Long-lived, so it gets its own thread rather than holding a pool worker
+        threading.Thread(target=stream_thread, daemon=True).start()
+    
+    def stop_price_stream(self):
+        """Stop the price stream thread, if any"""
+        if self._price_stream_stop is not None:
+            self._price_stream_stop.set()
+            self._price_stream_stop = None
+        self.price_stream_active = False
+    
+    def consume_price_stream(self, response, stop_event):
+        """Read Server-Sent Events from an open price stream"""
+        event_type, event_data = 'message', []
+        for line in response.iter_lines(decode_unicode=True):
+            if stop_event.is_set():
+                return
+            if line is None:
+                continue
+            if line == '':
+                if event_data:
+                    self.on_price_stream_event(event_type, json.loads('\n'.join(event_data)))
+                event_type, event_data = 'message', []
+            elif line.startswith(':'):
+                continue  # heartbeat
+            elif line.startswith('event:'):
+                event_type = line[6:].strip()
+            elif line.startswith('data:'):
+                event_data.append(line[5:].strip())
+    
+    def on_price_stream_event(self, event_type, data):
+        """Handle one decoded price stream event (background thread)"""
+        if event_type == 'price':
+            self.current_price = data['price']
+            self.last_price_seq = data.get('seq', self.last_price_seq)
+            self.market_closed_shown = False
+            self.poll_scheduler.market_closed = False
+            self.ui_state.set('price', self.current_price)
+        elif event_type == 'error':
+            error_msg = data.get('error', 'Price stream error')
+            logger.warning("Price stream error: %s", error_msg)
+            self.poll_scheduler.market_closed = is_market_closed_error(error_msg)
+            def update_status_error(dt):
+                self.update_status(f"Price error: {error_msg}")
+            Clock.schedule_once(update_status_error, 0)
+    
+    def schedule_next_poll(self, delay=None):
+        """(Re)schedule the next price poll, by default at the scheduler's interval"""
+        if self._poll_event is not None:
+            self._poll_event.cancel()
+        if delay is None:
+            delay = self.poll_scheduler.next_interval()
+        self._poll_event = Clock.schedule_once(self.on_poll_timer, delay)
+    
+    def on_poll_timer(self, dt):
+        self.update_price(dt)
+        self.schedule_next_poll()
+    
+    def boost_polling(self):
+        """Poll fast around order entry"""
+        self.poll_scheduler.boost()
+        self.schedule_next_poll(0)
+    
+    def on_lot_input_focus(self, instance, focused):
+        if focused:
+            self.boost_polling()
+    
+    def on_pause(self):
+        # Keep running in the background, but poll slowly and drop the stream
+        self.poll_scheduler.paused = True
+        self.stop_price_stream()
+        self.schedule_next_poll()
+        return True
+    
+    def on_resume(self):
+        self.poll_scheduler.paused = False
+        if self.symbol_detected:
+            self.start_price_stream()
+        self.schedule_next_poll(0)
+    
     def update_price(self, dt):
         """Update gold price from MT5 via Flask API"""
         if not self.symbol_detected or not self.symbol:
             return
         
+        if self.price_stream_active:
+            return
+        
         def fetch_price():
             try:
-                response = self.make_secure_request('get_price', {})
+                response = self.make_secure_request('get_price', {}, batch=True)
                 if response:
+                    if 'next_poll_ms' in response:
+                        self.poll_scheduler.server_hint = response['next_poll_ms'] / 1000
                     if 'price' in response:
                         self.current_price = response['price']
                         self.market_closed_shown = False
-                        def update_ui_callback(dt):
-                            self.update_ui()
-                        Clock.schedule_once(update_ui_callback, 0)
+                        self.poll_scheduler.market_closed = False
+                        self.ui_state.set('price', self.current_price)
                     elif 'error' in response:
-                        print(f"Price fetch error: {response['error']}")
+                        logger.warning("Price fetch error: %s", response['error'])
                         if "not found" in response['error'].lower():
                             def update_status_redetect(dt):
                                 self.update_status("Symbol issue - Re-detecting...")
                             Clock.schedule_once(update_status_redetect, 0)
                             self.symbol_detected = False
                             self.detect_gold_symbol()
-                        elif "market is closed" in response['error'].lower() and not self.market_closed_shown:
+                        elif is_market_closed_error(response['error']):
+                            self.poll_scheduler.market_closed = True
+                            if self.market_closed_shown:
+                                return
                             symbol_name = self.symbol
                             def show_market_closed_popup(dt):
                                 self.show_popup("Market Closed", 
@@ -397,28 +1203,82 @@ class GoldTradingApp(App):
                                 self.update_status(f"Price error: {error_msg}")
                             Clock.schedule_once(update_status_error, 0)
             except Exception as e:
-                print(f"Price update error: {e}")
+                logger.error("Price update error: %s", e)
                 def update_status_failed(dt):
                     self.update_status("Price update failed")
                 Clock.schedule_once(update_status_failed, 0)
         
-        threading.Thread(target=fetch_price, daemon=True).start()
+        self.workers.submit(fetch_price, PRIORITY_POLL, key='price')
+    
+    def on_stop(self):
+        self.stop_price_stream()
+        self.http.close()
     
     def update_status(self, message):
-        """Update status label"""
-        self.status_label.text = message
+        """Update status label (safe from any thread)"""
+        self.ui_state.set('status', message)
+    
+    def render_ui_field(self, field, value):
+        """Write one dirty field to its label (main thread, once per frame)"""
+        if field == 'price':
+            self.price_label.text = f'Gold Price: ${value:.2f}'
+            if value:
+                self.price_chart.add_price(value)
+        elif field == 'balance':
+            self.balance_label.text = f'Balance: ${value:.2f}'
+        elif field == 'position':
+            self.position_label.text = f'Position: {value:.3f} oz'
+        elif field == 'symbol':
+            self.symbol_label.text = f'Gold Symbol: {value}' if value else 'Detecting gold symbol...'
+        elif field == 'status':
+            self.status_label.text = value
+        elif field == 'latency':
+            self.latency_label.text = value
+    
+    def toggle_latency_overlay(self, instance):
+        """Show or hide per-endpoint p50/p99 latency and the clock offset"""
+        if self._latency_event is None:
+            self.latency_label.height = LATENCY_OVERLAY_HEIGHT
+            self.latency_label.opacity = 1
+            self.refresh_latency_overlay()
+            self._latency_event = Clock.schedule_interval(self.refresh_latency_overlay, LATENCY_OVERLAY_INTERVAL)
+        else:
+            self._latency_event.cancel()
+            self._latency_event = None
+            self.latency_label.height = 0
+            self.latency_label.opacity = 0
     
-    def update_ui(self):
-        """Update UI elements on main thread"""
-        self.price_label.text = f'Gold Price: ${self.current_price:.2f}'
-        self.balance_label.text = f'Balance: ${self.balance:.2f}'
-        self.position_label.text = f'Position: {self.position:.3f} oz'
+    def refresh_latency_overlay(self, dt=None):
+        lines = []
+        for endpoint, stats in sorted(self.http.latency_summary().items()):
+            if stats['samples']:
+                lines.append(f"{endpoint}: p50 {stats['p50_ms']:.0f} ms  p99 {stats['p99_ms']:.0f} ms  (n={stats['samples']}, err={stats['errors']})")
+        clock = self.http.clock.summary()
+        if clock['samples']:
+            lines.append(f"clock offset {clock['offset_ms']:+d} ms (best rtt {clock['best_rtt_ms']:.0f} ms)")
+        self.ui_state.set('latency', '\n'.join(lines) or 'No requests timed yet')
+    
+    def export_diagnostics(self, instance):
+        """Write latency, connection and clock data to a JSON file in user_data_dir"""
+        def write_diagnostics():
+            path = os.path.join(self.user_data_dir, f"diagnostics-{time.strftime('%Y%m%d-%H%M%S')}.json")
+            report = self.http.diagnostics()
+            report['exported_at'] = int(time.time() * 1000)
+            report['symbol'] = self.symbol
+            try:
+                with open(path, 'w') as f:
+                    json.dump(report, f, indent=2)
+                logger.info("Diagnostics written to %s", path)
+                self.update_status(f"Diagnostics saved to {path}")
+            except OSError as e:
+                logger.warning("Could not write diagnostics: %s", e)
+                self.update_status("Could not save diagnostics")
         
-        if self.symbol:
-            self.symbol_label.text = f'Symbol: {self.symbol}'
+        self.workers.submit(write_diagnostics, PRIORITY_POLL, key='export_diagnostics')
     
     def on_buy_pressed(self, instance):
         """Handle buy button press"""
+        self.boost_polling()
         if not self.symbol_detected:
             self.show_popup("Error", "Gold symbol not detected yet. Please wait or refresh connection.")
             return
@@ -434,6 +1294,7 @@ class GoldTradingApp(App):
     
     def on_sell_pressed(self, instance):
         """Handle sell button press"""
+        self.boost_polling()
         if not self.symbol_detected:
             self.show_popup("Error", "Gold symbol not detected yet. Please wait or refresh connection.")
             return
@@ -449,6 +1310,14 @@ class GoldTradingApp(App):
     
     def execute_trade(self, action, lot_size):
         """Execute trade via MT5 API"""
+        if self.pending_trade is not None:
+            self.update_status(f"{self.pending_trade.upper()} still being sent...")
+            return
+        self.pending_trade = action
+        
+        # One key per tap: retries of this order can never fill twice
+        idempotency_key = secrets.token_hex(16)
+        
         def trade_thread():
             def update_status_executing(dt):
                 self.update_status(f"Executing {action.upper()}...")
@@ -456,45 +1325,101 @@ class GoldTradingApp(App):
             
             trade_data = {
                 'action': action,
-                'lot_size': lot_size
+                'lot_size': lot_size,
+                'idempotency_key': idempotency_key
             }
             
-            response = self.make_secure_request('execute_trade', trade_data)
+            try:
+                response = self.submit_order(trade_data)
+            finally:
+                self.pending_trade = None
             
-            if response and response.get('success'):
-                def trade_success_callback(dt):
-                    self.trade_success(action, lot_size, response)
-                Clock.schedule_once(trade_success_callback, 0)
-                self.fetch_account_info()
+            if 'order_handle' not in response:
+                self.finish_trade(action, lot_size, response)
+            elif response.get('completed_at') is not None:
+                self.finish_trade(action, lot_size, dict(response['result'], order_handle=response['order_handle']))
             else:
-                error_msg = response.get('error', 'Trade failed') if response else 'Connection error'
-                print(f"Trade failed: {error_msg}")
-                if "market is closed" in error_msg.lower():
-                    symbol_name = self.symbol
-                    def show_market_closed_popup(dt):
-                        self.show_popup("Market Closed", 
-                                      f"Cannot execute trade: Market is closed for {symbol_name}.")
-                    Clock.schedule_once(show_market_closed_popup, 0)
-                elif "symbol" in error_msg.lower() and "not found" in error_msg.lower():
-                    def show_symbol_error_popup(dt):
-                        self.show_popup("Symbol Error", 
-                                      "Gold symbol issue. Trying to re-detect symbol...")
-                    Clock.schedule_once(show_symbol_error_popup, 0)
-                    self.symbol_detected = False
-                    self.detect_gold_symbol()
-                else:
-                    def trade_failed_callback(dt):
-                        self.trade_failed(error_msg)
-                    Clock.schedule_once(trade_failed_callback, 0)
+                self.update_status(f"{action.upper()} accepted, waiting for fill...")
+                self.track_order(response['order_handle'], action, lot_size, time.monotonic() + ORDER_FILL_TIMEOUT)
+        
+        self.workers.submit(trade_thread, PRIORITY_TRADE)
+    
+    def submit_order(self, trade_data):
+        """Hand an order to the server; returns its acknowledgement
+        
+        The acknowledgement comes back before the broker fills the order, so
+        the next tap is accepted right away. Servers without the order
+        pipeline get a plain /api/execute_trade, whose result is returned.
+        """
+        for attempt in range(ORDER_SUBMIT_ATTEMPTS):
+            response = self.make_secure_request('submit_order', trade_data)
+            if not is_retryable_error(response.get('error')):
+                break
+            logger.info("Order submit attempt %s failed, retrying: %s", attempt + 1, response['error'])
+        
+        if 'status 404' in response.get('error', ''):
+            # Older server without the order pipeline
+            return self.make_secure_request('execute_trade', trade_data)
+        return response
+    
+    def track_order(self, handle, action, lot_size, deadline):
+        """Check an accepted order every ORDER_STATUS_POLL_INTERVAL until it finishes
+        
+        Each check is one short keyed job and the next is scheduled on the
+        Clock, so a pending order never holds a network worker while it waits.
+        """
+        def check_status():
+            polled = self.make_secure_request('order_status', {'order_handle': handle})
+            if polled.get('completed_at') is not None:
+                self.finish_trade(action, lot_size, dict(polled['result'], order_handle=handle))
+            elif 'order_handle' not in polled and not is_retryable_error(polled.get('error')):
+                self.finish_trade(action, lot_size, polled)
+            elif time.monotonic() >= deadline:
+                self.finish_trade(action, lot_size, {
+                    'error': f'Order {handle} was accepted but is not confirmed yet. Check positions before trading again.'
+                })
+            else:
+                self.track_order(handle, action, lot_size, deadline)
+        
+        def schedule_check(dt):
+            self.workers.submit(check_status, PRIORITY_TRADE, key=f'order_status:{handle}')
+        Clock.schedule_once(schedule_check, ORDER_STATUS_POLL_INTERVAL)
+    
+    def finish_trade(self, action, lot_size, response):
+        """Report a trade's final result (any thread)"""
+        if response and response.get('success'):
+            def trade_success_callback(dt):
+                self.trade_success(action, lot_size, response)
+            Clock.schedule_once(trade_success_callback, 0)
+            self.fetch_account_info()
+            return
         
-        threading.Thread(target=trade_thread, daemon=True).start()
+        error_msg = response.get('error', 'Trade failed') if response else 'Connection error'
+        logger.warning("Trade failed: %s", error_msg)
+        if is_market_closed_error(error_msg):
+            symbol_name = self.symbol
+            def show_market_closed_popup(dt):
+                self.show_popup("Market Closed", 
+                              f"Cannot execute trade: Market is closed for {symbol_name}.")
+            Clock.schedule_once(show_market_closed_popup, 0)
+        elif "symbol" in error_msg.lower() and "not found" in error_msg.lower():
+            def show_symbol_error_popup(dt):
+                self.show_popup("Symbol Error", 
+                              "Gold symbol issue. Trying to re-detect symbol...")
+            Clock.schedule_once(show_symbol_error_popup, 0)
+            self.symbol_detected = False
+            self.detect_gold_symbol()
+        else:
+            def trade_failed_callback(dt):
+                self.trade_failed(error_msg)
+            Clock.schedule_once(trade_failed_callback, 0)
     
     def trade_success(self, action, lot_size, response):
         """Handle successful trade"""
         actual_price = response.get('price', self.current_price)
         order_id = response.get('order_id', 'Unknown')
         
-        self.status_label.text = f"{action.upper()} {lot_size} oz executed successfully"
+        self.update_status(f"{action.upper()} {lot_size} oz executed successfully")
         self.show_popup("Trade Executed", 
                        f"{action.upper()} {lot_size} oz of Gold\n"
                        f"Price: ${actual_price:.2f}\n"
@@ -502,7 +1427,7 @@ class GoldTradingApp(App):
     
     def trade_failed(self, error_msg):
         """Handle failed trade"""
-        self.status_label.text = "Trade failed"
+        self.update_status("Trade failed")
         self.show_popup("Trade Failed", error_msg)
     
     def show_popup(self, title, message):
@@ -520,7 +1445,7 @@ class GoldTradingApp(App):
     def debug_connection(self):
         """Debug connection issues"""
         def debug_thread():
-            print("=== Starting Connection Debug ===")
+            logger.info("=== Starting Connection Debug ===")
             # Test raw socket connection
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -529,22 +1454,23 @@ class GoldTradingApp(App):
                 sock.close()
                 
                 if result == 0:
-                    print("Socket connection: SUCCESS")
+                    logger.info("Socket connection: SUCCESS")
                 else:
-                    print(f"Socket connection: FAILED (error {result})")
+                    logger.warning("Socket connection: FAILED (error %s)", result)
             except Exception as e:
-                print(f"Socket test error: {e}")
+                logger.warning("Socket test error: %s", e)
             
             # Test HTTP request
             try:
-                response = requests.get(f"{self.api_base_url}/status", timeout=10)
-                print(f"HTTP status: {response.status_code}")
-                print(f"Response: {response.text}")
+                response = self.http.get('status', timeout=10)
+                logger.info("HTTP status: %s", response.status_code)
+                logger.debug("Response: %s", response.text)
+                logger.info("Connection reuse: %s", self.http.connection_stats())
             except Exception as e:
-                print(f"HTTP test error: {e}")
-            print("=== End Connection Debug ===")
+                logger.warning("HTTP test error: %s", e)
+            logger.info("=== End Connection Debug ===")
         
-        threading.Thread(target=debug_thread, daemon=True).start()
+        self.workers.submit(debug_thread, PRIORITY_POLL, key='debug_connection')
 
 if __name__ == '__main__':
     GoldTradingApp().run()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import bisect
+import threading
+
+# Upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense
+
+    observe() only bumps one slot; buckets are summed when rendered.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+class MetricsRegistry:
+    """Latency histograms, counters and gauges rendered in Prometheus text format
+
+    Every update is a dict lookup and an increment under one lock, so it is
+    cheap enough to run on every request and every MT5 call.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._help = {}  # name -> (type, help text)
+        self._histograms = {}  # name -> {labels: Histogram}
+        self._counters = {}  # name -> {labels: value}
+        self._gauges = {}  # name -> {labels: value}
+        self._callbacks = {}  # name -> fn returning the current gauge value
+
+    def describe(self, name, kind, text):
+        """Register the # TYPE and # HELP lines for a metric"""
+        self._help[name] = (kind, text)
+
+    def observe(self, name, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def gauge_add(self, name, amount, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def gauge_callback(self, name, fn):
+        """Report fn() as an unlabelled gauge each time metrics are rendered"""
+        self._callbacks[name] = fn
+
+    def render(self):
+        """Text exposition format 0.0.4"""
+        with self._lock:
+            histograms = {name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                          for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+
+        for name, fn in self._callbacks.items():
+            try:
+                gauges[name] = {(): fn()}
+            except Exception:
+                continue
+
+        lines = []
+        for name in sorted(set(histograms) | set(counters) | set(gauges)):
+            kind, text = self._help.get(name, (None, None))
+            if text:
+                lines.append(f'# HELP {name} {text}')
+
+            if name in histograms:
+                lines.append(f'# TYPE {name} histogram')
+                for key, (counts, total, count) in sorted(histograms[name].items()):
+                    labels = _format_labels(key)
+                    prefix = f'{labels},' if labels else ''
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {count}')
+                    suffix = f'{{{labels}}}' if labels else ''
+                    lines.append(f'{name}_sum{suffix} {total!r}')
+                    lines.append(f'{name}_count{suffix} {count}')
+                continue
+
+            series = counters.get(name) or gauges.get(name)
+            lines.append(f'# TYPE {name} {kind or ("counter" if name in counters else "gauge")}')
+            for key, value in sorted(series.items()):
+                labels = _format_labels(key)
+                suffix = f'{{{labels}}}' if labels else ''
+                lines.append(f'{name}{suffix} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
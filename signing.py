@@ -0,0 +1,67 @@
+import hashlib
+import heapq
+import hmac
+import json
+import threading
+
+# Value of the X-Signature-Version header for raw-body signatures
+RAW_SIGNATURE_VERSION = '2'
+
+def encode_body(data):
+    """Serialize a request payload once; these bytes are both signed and sent"""
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def raw_signature(secret, body):
+    """HMAC-SHA256 of the exact request body bytes"""
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+def canonical_signature(secret, data):
+    """HMAC-SHA256 of the sorted-key JSON dump of data (original scheme)"""
+    return hmac.new(
+        secret.encode('utf-8'),
+        json.dumps(data, sort_keys=True).encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+class ReplayGuard:
+    """Remembers recently seen signatures in a fixed amount of memory
+
+    Entries older than max_age can never pass the timestamp check again, so
+    they are dropped first. When the cache is full of live entries the one
+    with the earliest request timestamp is evicted and its timestamp becomes
+    a floor: anything stamped at or before it is rejected, because it can no
+    longer be proven unseen. Evicting by timestamp rather than arrival keeps
+    one request stamped ahead of the server clock from pushing the floor
+    past honest requests.
+    """
+
+    def __init__(self, max_age, capacity=10000):
+        self.max_age = max_age
+        self.capacity = capacity
+        self._seen = {}  # signature -> request timestamp
+        self._by_time = []  # heap of (request timestamp, signature)
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def check(self, signature, timestamp, now):
+        """Record signature and return True if it has not been seen before"""
+        with self._lock:
+            seen, by_time = self._seen, self._by_time
+            oldest_allowed = now - self.max_age
+            while by_time and by_time[0][0] < oldest_allowed:
+                del seen[heapq.heappop(by_time)[1]]
+
+            if signature in seen or timestamp <= self._floor:
+                return False
+
+            if len(seen) >= self.capacity:
+                evicted_timestamp, evicted = heapq.heappop(by_time)
+                del seen[evicted]
+                self._floor = max(self._floor, evicted_timestamp)
+
+            seen[signature] = timestamp
+            heapq.heappush(by_time, (timestamp, signature))
+            return True
+
+    def __len__(self):
+        return len(self._seen)
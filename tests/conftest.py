@@ -0,0 +1,8 @@
+import os
+import sys
+
+# app.py picks its MT5 module at import time; tests always use the simulated terminal
+os.environ.setdefault('GOLD_API_FAKE_MT5', '1')
+os.environ.setdefault('FAKE_MT5_LATENCY_MS', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
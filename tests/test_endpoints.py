@@ -0,0 +1,251 @@
+import secrets
+import threading
+import time
+
+import pytest
+
+import app
+from signing import RAW_SIGNATURE_VERSION, encode_body, raw_signature
+
+@pytest.fixture(scope='module')
+def client():
+    assert isinstance(app.MetaTrader5, app.FakeMetaTrader5)
+    assert app.initialize_mt5()
+    return app.app.test_client()
+
+def post(client, endpoint, data=None):
+    """Signed POST, the way the app sends it"""
+    data = dict(data or {})
+    data['timestamp'] = int(time.time() * 1000)
+    data['nonce'] = secrets.token_hex(8)
+    body = encode_body(data)
+    return client.post(f'/api/{endpoint}', data=body, headers={
+        'Content-Type': 'application/json',
+        'X-API-Key': app.API_KEY,
+        'X-Signature': raw_signature(app.API_SECRET, body),
+        'X-Signature-Version': RAW_SIGNATURE_VERSION
+    })
+
+def test_status_and_metrics(client):
+    response = client.get('/api/status')
+    assert response.status_code == 200
+    assert response.get_json()['mt5_connected'] is True
+    assert 'X-Server-Time' in response.headers
+    
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert b'gold_api_request_duration_seconds_bucket' in response.data
+
+def test_rejects_unsigned(client):
+    assert client.post('/api/get_price', json={'symbol': 'XAUUSD'}).status_code == 401
+
+def test_rejects_malformed_signed_bodies(client):
+    for body in (b'[1,2]', encode_body({'timestamp': 'soon', 'nonce': secrets.token_hex(8)})):
+        response = client.post('/api/get_price', data=body, headers={
+            'Content-Type': 'application/json',
+            'X-API-Key': app.API_KEY,
+            'X-Signature': raw_signature(app.API_SECRET, body),
+            'X-Signature-Version': RAW_SIGNATURE_VERSION
+        })
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+def test_symbol_endpoints(client):
+    response = post(client, 'detect_gold_symbol')
+    assert response.status_code == 200
+    assert response.get_json()['gold_symbol'] == 'XAUUSD'
+    
+    assert post(client, 'list_symbols', {'prefix': 'XAU'}).status_code == 200
+    assert post(client, 'list_symbols', {'prefix': ['XAU']}).status_code == 400
+    assert post(client, 'set_gold_symbol', {'symbol': 'XAUUSD'}).status_code == 200
+
+def test_quote_endpoints(client):
+    response = post(client, 'get_price', {'symbol': 'XAUUSD'})
+    assert response.status_code == 200
+    assert response.get_json()['price'] > 0
+    # A fresh tick still gets the default hint; faster polling is up to the client
+    assert response.get_json()['next_poll_ms'] >= app.POLL_HINT_DEFAULT_MS
+    
+    response = post(client, 'get_prices', {'symbols': ['XAUUSD', 'EURUSD', 'NOPE']})
+    assert response.status_code == 200
+    assert 'NOPE' in response.get_json()['missing']
+    
+    assert post(client, 'get_indicators', {'symbol': 'XAUUSD', 'points': 10}).status_code == 200
+    for points in ('abc', -5, 10 ** 9):
+        response = post(client, 'get_indicators', {'symbol': 'XAUUSD', 'points': points})
+        assert response.status_code == 200
+        assert len(response.get_json().get('history', {}).get('price', [])) <= app.MAX_HISTORY_POINTS
+
+def test_rejects_non_string_symbols(client):
+    assert post(client, 'get_prices', {'symbols': [{'a': 1}]}).status_code == 400
+    assert post(client, 'get_prices', {'symbols': ['XAUUSD', ['EURUSD']]}).status_code == 400
+    for endpoint in ('get_price', 'get_indicators', 'stream_price', 'set_gold_symbol'):
+        assert post(client, endpoint, {'symbol': ['XAUUSD']}).status_code == 400
+    response = post(client, 'execute_trade', {'symbol': {'s': 1}, 'action': 'buy', 'lot_size': 0.01})
+    assert response.status_code == 400
+
+def test_price_pollers_are_validated_and_capped(client, monkeypatch):
+    assert post(client, 'get_price', {'symbol': 'NOPE'}).status_code == 400
+    assert 'NOPE' not in app.tick_pollers._pollers
+    
+    monkeypatch.setattr(app.tick_pollers, 'max_pollers', len(app.tick_pollers._pollers))
+    assert post(client, 'get_price', {'symbol': 'SYM0000'}).status_code == 503
+    assert post(client, 'stream_price', {'symbol': 'SYM0000'}).status_code == 503
+
+def test_stream_price_sends_first_event(client):
+    response = post(client, 'stream_price', {'symbol': 'XAUUSD'})
+    assert response.status_code == 200
+    # The retry hint comes first, then the current price
+    chunks = iter(response.response)
+    received = b''
+    while b'event: price' not in received:
+        chunk = next(chunks)
+        received += chunk if isinstance(chunk, bytes) else chunk.encode()
+    response.close()
+
+def test_trading_endpoints(client):
+    response = post(client, 'execute_trade', {'symbol': 'XAUUSD', 'action': 'buy', 'lot_size': 0.01})
+    assert response.status_code == 200
+    assert response.get_json()['success']
+    
+    response = post(client, 'submit_order', {'symbol': 'XAUUSD', 'action': 'sell', 'lot_size': 0.01,
+                                             'idempotency_key': 'smoke-1'})
+    assert response.status_code in (200, 202)
+    handle = response.get_json()['order_handle']
+    
+    response = post(client, 'order_status', {'order_handle': handle, 'wait_ms': 2000})
+    assert response.status_code == 200
+    assert response.get_json()['state'] == 'filled'
+    
+    response = post(client, 'execute_trades', {'orders': [{'action': 'buy', 'lot_size': 0.01}] * 2,
+                                               'symbol': 'XAUUSD'})
+    assert response.status_code == 200
+    assert response.get_json()['filled'] == 2
+
+def test_execute_trades_replays_keyed_basket(client):
+    basket = {'orders': [{'action': 'buy', 'lot_size': 0.01}] * 2, 'symbol': 'XAUUSD',
+              'idempotency_key': secrets.token_hex(8)}
+    first = post(client, 'execute_trades', basket)
+    assert first.status_code == 200
+    assert first.get_json()['duplicate'] is False
+    positions = len(app.mt5.positions_get())
+    
+    retry = post(client, 'execute_trades', basket)
+    assert retry.status_code == 200
+    assert retry.get_json()['duplicate'] is True
+    assert retry.get_json()['results'] == first.get_json()['results']
+    assert len(app.mt5.positions_get()) == positions
+    
+    changed = dict(basket, orders=[{'action': 'sell', 'lot_size': 0.01}])
+    assert post(client, 'execute_trades', changed).status_code == 409
+
+def test_rejects_invalid_orders(client):
+    for lot_size in (float('nan'), float('inf')):
+        response = post(client, 'execute_trade', {'symbol': 'XAUUSD', 'action': 'buy', 'lot_size': lot_size})
+        assert response.status_code == 400
+    
+    order = {'symbol': 'XAUUSD', 'action': 'buy', 'lot_size': 0.01}
+    for key in (['k'], {'k': 1}, ''):
+        for endpoint in ('execute_trade', 'submit_order'):
+            assert post(client, endpoint, dict(order, idempotency_key=key)).status_code == 400
+        assert post(client, 'execute_trades', {'orders': [order], 'idempotency_key': key}).status_code == 400
+        assert post(client, 'order_status', {'idempotency_key': key}).status_code == 400
+    assert post(client, 'order_status', {'order_handle': ['h']}).status_code == 400
+    
+    # Infinity is valid JSON for Python; it must not overflow int()
+    handle = post(client, 'submit_order', order).get_json()['order_handle']
+    assert post(client, 'order_status', {'order_handle': handle, 'wait_ms': float('inf')}).status_code in (200, 202)
+
+def test_account_and_positions(client):
+    response = post(client, 'get_account_info')
+    assert response.status_code == 200
+    etag = response.get_json()['etag']
+    assert post(client, 'get_account_info', {'if_none_match': etag}).status_code == 304
+    
+    response = post(client, 'get_positions')
+    assert response.status_code == 200
+    assert response.get_json()['delta'] is False
+    
+    response = post(client, 'batch', {'requests': [{'endpoint': 'get_price', 'data': {'symbol': 'XAUUSD'}},
+                                                   {'endpoint': 'get_account_info', 'data': {}}]})
+    assert response.status_code == 200
+    assert [r['status'] for r in response.get_json()['results']] == [200, 200]
+
+def get_positions(client, data=None):
+    """get_positions against a fresh read of the terminal"""
+    app.positions_snapshots.invalidate()
+    response = post(client, 'get_positions', data)
+    assert response.status_code == 200
+    return response.get_json()
+
+def trade(client, action):
+    # XAGUSD is only traded here, so a sell closes exactly the buy before it
+    response = post(client, 'execute_trade', {'symbol': 'XAGUSD', 'action': action, 'lot_size': 0.01})
+    assert response.get_json()['success']
+
+def test_positions_delta(client):
+    base = get_positions(client)
+    since_base = {'since_version': base['version'], 'epoch': base['epoch']}
+    
+    trade(client, 'buy')
+    after_open = get_positions(client, since_base)
+    assert after_open['delta'] is True
+    [ticket] = [p['ticket'] for p in after_open['opened'] if p['symbol'] == 'XAGUSD']
+    
+    trade(client, 'sell')
+    get_positions(client)
+    
+    # Opened and closed inside the window: not reported at all
+    delta = get_positions(client, since_base)
+    assert delta['delta'] is True
+    reported = [p['ticket'] for p in delta['opened'] + delta['changed']] + delta['closed']
+    assert ticket not in reported
+    
+    delta = get_positions(client, {'since_version': after_open['version'], 'epoch': base['epoch']})
+    assert ticket in delta['closed']
+    
+    # Another epoch (a restarted server) gets the full list
+    full = get_positions(client, dict(since_base, epoch='0'))
+    assert full['delta'] is False
+    assert 'all_positions' in full
+
+def test_positions_delta_falls_back_when_history_is_evicted(client, monkeypatch):
+    monkeypatch.setattr(app, 'position_book', app.PositionBook(history_size=1))
+    base = get_positions(client)
+    trade(client, 'buy')
+    get_positions(client)
+    trade(client, 'sell')
+    
+    response = get_positions(client, {'since_version': base['version'], 'epoch': app.position_book.epoch})
+    assert response['delta'] is False
+    assert not any(p['symbol'] == 'XAGUSD' for p in response['all_positions'])
+
+def test_stream_price_is_capped(client, monkeypatch):
+    monkeypatch.setattr(app, 'price_stream_slots', threading.BoundedSemaphore(1))
+    
+    first = post(client, 'stream_price', {'symbol': 'XAUUSD'})
+    assert first.status_code == 200
+    assert post(client, 'stream_price', {'symbol': 'XAUUSD'}).status_code == 503
+    
+    # Closing a stream frees its slot
+    first.close()
+    second = post(client, 'stream_price', {'symbol': 'XAUUSD'})
+    assert second.status_code == 200
+    second.close()
+
+def test_responses_vary_on_accept(client):
+    msgpack = pytest.importorskip('msgpack')
+    response = client.get('/api/status')
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.vary
+    
+    response = client.get('/api/status', headers={'Accept': app.MSGPACK_MIMETYPE})
+    assert response.mimetype == app.MSGPACK_MIMETYPE
+    assert 'Accept' in response.vary
+    assert msgpack.unpackb(response.data)['success'] is True
+    
+    with app.app.test_request_context(headers={'Accept': app.MSGPACK_MIMETYPE}):
+        assert msgpack.unpackb(app.jsonify(1, 2).data) == [1, 2]
+        assert msgpack.unpackb(app.jsonify(a=1).data) == {'a': 1}
+        with pytest.raises(TypeError):
+            app.jsonify({'a': 1}, b=2)
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import app
+from fake_mt5 import FakeMetaTrader5
+
+def make_proxy():
+    fake = FakeMetaTrader5(symbol_count=10, latency_ms=0, seed=1)
+    return fake, app.MT5Proxy(fake, app.MT5Executor())
+
+def test_proxy_calls_module_function_on_executor_thread():
+    fake, proxy = make_proxy()
+    assert proxy.initialize() is True
+    
+    tick = proxy.symbol_info_tick('XAUUSD')
+    assert tick is not None and tick.ask > tick.bid
+    # The cached wrapper is reused and still reaches the module
+    assert proxy.symbol_info_tick is proxy.symbol_info_tick
+    assert proxy.symbol_info_tick('XAUUSD').bid > 0
+
+def test_proxy_passes_constants_through():
+    fake, proxy = make_proxy()
+    assert proxy.TRADE_RETCODE_DONE == fake.TRADE_RETCODE_DONE
+    assert proxy.ORDER_TYPE_BUY == fake.ORDER_TYPE_BUY
+
+def test_proxy_propagates_exceptions():
+    class Broken(FakeMetaTrader5):
+        def account_info(self):
+            raise RuntimeError('terminal gone')
+    
+    proxy = app.MT5Proxy(Broken(symbol_count=5, latency_ms=0), app.MT5Executor())
+    try:
+        proxy.account_info()
+    except RuntimeError as e:
+        assert str(e) == 'terminal gone'
+    else:
+        raise AssertionError('expected RuntimeError')
+
+def test_proxy_failure_marks_connection_unhealthy():
+    class Broken(FakeMetaTrader5):
+        def positions_get(self, **kwargs):
+            raise RuntimeError('terminal gone')
+    
+    fake = Broken(symbol_count=5, latency_ms=0)
+    proxy = app.MT5Proxy(fake, app.MT5Executor())
+    manager = app.MT5ConnectionManager(proxy, health_check_interval=3600)
+    proxy.on_failure = manager.mark_unhealthy
+    assert manager.ensure_connected()
+    
+    fake.shutdown()
+    # Still trusted: the last health check is recent
+    assert manager.connected
+    with pytest.raises(RuntimeError):
+        proxy.positions_get()
+    # The failure forces a health check, which notices the dead terminal and reconnects
+    assert manager.ensure_connected()
+    assert manager.state()['state'] == 'connected'
+    assert fake.terminal_info() is not None
+
+def test_connection_manager_connects_through_proxy():
+    fake, proxy = make_proxy()
+    manager = app.MT5ConnectionManager(proxy, health_check_interval=0)
+    assert manager.ensure_connected()
+    assert manager.state()['state'] == 'connected'
+    
+    # Health check goes through terminal_info on the proxy
+    assert manager.ensure_connected()
+    
+    # A terminal that stops answering is noticed and reconnected
+    fake.shutdown()
+    assert manager.ensure_connected()
+    assert fake.terminal_info() is not None
+
+class SlowOrders(FakeMetaTrader5):
+    def order_send(self, request):
+        time.sleep(0.2)
+        return super().order_send(request)
+
+def test_running_order_send_is_not_abandoned_on_timeout():
+    fake = SlowOrders(symbol_count=5, latency_ms=0)
+    proxy = app.MT5Proxy(fake, app.MT5Executor(timeout=0.05))
+    proxy.initialize()
+    
+    result = proxy.order_send({'symbol': 'XAUUSD', 'volume': 0.01, 'type': fake.ORDER_TYPE_BUY})
+    assert result.retcode == fake.TRADE_RETCODE_DONE
+    assert len(fake.positions_get()) == 1
+
+def test_queued_call_times_out_without_running():
+    fake = SlowOrders(symbol_count=5, latency_ms=0)
+    executor = app.MT5Executor(timeout=0.05)
+    proxy = app.MT5Proxy(fake, executor)
+    proxy.initialize()
+    
+    # Occupy the executor thread so the next call is still queued when it times out
+    blocker = threading.Thread(target=proxy.order_send,
+                               args=({'symbol': 'XAUUSD', 'volume': 0.01, 'type': fake.ORDER_TYPE_BUY},))
+    blocker.start()
+    time.sleep(0.02)
+    with pytest.raises(app.MT5Timeout):
+        proxy.order_send({'symbol': 'XAUUSD', 'volume': 0.01, 'type': fake.ORDER_TYPE_SELL})
+    blocker.join()
+    time.sleep(0.3)
+    # Only the first order reached the terminal
+    assert [p.type for p in fake.positions_get()] == [fake.POSITION_TYPE_BUY]
@@ -0,0 +1,58 @@
+import app
+
+def position(ticket, profit=0.0):
+    return {'ticket': ticket, 'symbol': 'XAUUSD', 'volume': 0.01, 'type': 'buy', 'profit': profit}
+
+def tickets(positions):
+    return sorted(p['ticket'] for p in positions)
+
+def test_delta_merges_several_versions():
+    book = app.PositionBook()
+    base = book.update([position(1), position(2), position(3)])
+    book.update([position(1, 5.0), position(2), position(3), position(4)])  # 1 changed, 4 opened
+    book.update([position(1, 6.0), position(3), position(4, 1.0)])  # 2 closed, 4 changed again
+    
+    opened, changed, closed = book.delta_since(base)
+    assert tickets(opened) == [4]
+    assert opened[0]['profit'] == 1.0
+    assert tickets(changed) == [1]
+    assert changed[0]['profit'] == 6.0
+    assert closed == [2]
+
+def test_opened_then_closed_inside_window_is_not_reported():
+    book = app.PositionBook()
+    base = book.update([position(1)])
+    book.update([position(1), position(2)])
+    book.update([position(1)])
+    
+    assert book.delta_since(base) == ([], [], [])
+
+def test_changed_then_closed_is_reported_closed_only():
+    book = app.PositionBook()
+    base = book.update([position(1), position(2)])
+    book.update([position(1), position(2, 3.0)])
+    book.update([position(1)])
+    
+    assert book.delta_since(base) == ([], [], [2])
+
+def test_current_version_has_empty_delta():
+    book = app.PositionBook()
+    version = book.update([position(1)])
+    assert book.update([position(1)]) == version
+    assert book.delta_since(version) == ([], [], [])
+
+def test_evicted_history_falls_back_to_full_response():
+    book = app.PositionBook(history_size=2)
+    base = book.update([position(1)])
+    for profit in (1.0, 2.0, 3.0):
+        book.update([position(1, profit)])
+    
+    assert book.delta_since(base) is None
+    # The versions still in history can be answered
+    _, changed, _ = book.delta_since(book.version - 2)
+    assert tickets(changed) == [1]
+
+def test_version_from_the_future_falls_back_to_full_response():
+    book = app.PositionBook()
+    book.update([position(1)])
+    assert book.delta_since(book.version + 1) is None
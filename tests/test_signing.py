@@ -0,0 +1,37 @@
+from signing import ReplayGuard
+
+def test_replayed_signature_is_rejected():
+    guard = ReplayGuard(max_age=60000, capacity=10)
+    assert guard.check('a', 1000, 1000)
+    assert not guard.check('a', 1000, 1500)
+    assert guard.check('b', 1000, 1500)
+
+def test_expired_entries_are_dropped():
+    guard = ReplayGuard(max_age=100, capacity=10)
+    assert guard.check('a', 1000, 1000)
+    assert guard.check('b', 1050, 1050)
+    # 'a' is now older than max_age; the timestamp check keeps it out from here on
+    assert guard.check('c', 1150, 1150)
+    assert len(guard) == 2
+
+def test_full_cache_rejects_only_requests_older_than_the_evicted_one():
+    guard = ReplayGuard(max_age=60000, capacity=4)
+    for i in range(4):
+        assert guard.check(f'r{i}', 1000 + i, 1000 + i)
+    
+    # The earliest-stamped entry makes room and becomes the floor
+    assert guard.check('r4', 1004, 1004)
+    assert not guard.check('r0', 1000, 1005)
+    assert not guard.check('late', 1000, 1005)
+    assert guard.check('r5', 1005, 1005)
+
+def test_future_stamped_request_does_not_block_honest_ones():
+    guard = ReplayGuard(max_age=60000, capacity=4)
+    now = 100000
+    # One client's clock runs 50 s ahead of the server
+    assert guard.check('ahead', now + 50000, now)
+    for i in range(20):
+        now += 1
+        assert guard.check(f'honest{i}', now, now)
+    # The future-stamped signature is still remembered
+    assert not guard.check('ahead', now + 50000 - 20, now)
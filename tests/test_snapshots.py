@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+import app
+from fake_mt5 import FakeMetaTrader5
+
+def run_concurrently(fn, callers=8):
+    results = [None] * callers
+    barrier = threading.Barrier(callers)
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_callers_share_one_load():
+    def load():
+        time.sleep(0.05)
+        return object()
+    
+    snapshots = app.SharedSnapshots(load, interval=10)
+    results = run_concurrently(snapshots.get)
+    assert snapshots.loads == 1
+    assert all(result is results[0] for result in results)
+
+def test_failed_load_is_shared_with_waiters():
+    def load():
+        time.sleep(0.05)
+        raise app.MT5Timeout('MT5 call account_info timed out')
+    
+    snapshots = app.SharedSnapshots(load, interval=10)
+    started = time.monotonic()
+    results = run_concurrently(snapshots.get)
+    assert snapshots.loads == 1
+    assert all(isinstance(result, app.MT5Timeout) for result in results)
+    assert time.monotonic() - started < 0.5
+
+def test_failed_load_is_retried_after_error_ttl(monkeypatch):
+    monkeypatch.setattr(app, 'SNAPSHOT_ERROR_TTL', 0.05)
+    outcomes = iter([RuntimeError('terminal gone'), 'account'])
+    def load():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    snapshots = app.SharedSnapshots(load, interval=10)
+    with pytest.raises(RuntimeError):
+        snapshots.get()
+    with pytest.raises(RuntimeError):
+        snapshots.get()
+    time.sleep(0.06)
+    assert snapshots.get() == 'account'
+    assert snapshots.loads == 2
+
+class CountingTerminal(FakeMetaTrader5):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {'symbol_select': 0, 'symbol_info': 0}
+    
+    def symbol_select(self, symbol, enable=True):
+        self.calls['symbol_select'] += 1
+        time.sleep(0.02)
+        return super().symbol_select(symbol, enable)
+    
+    def symbol_info(self, symbol):
+        self.calls['symbol_info'] += 1
+        return super().symbol_info(symbol)
+
+def test_symbol_specs_load_once_per_symbol(monkeypatch):
+    fake = CountingTerminal(symbol_count=10, latency_ms=0)
+    monkeypatch.setattr(app, 'mt5', app.MT5Proxy(fake, app.MT5Executor()))
+    specs = app.SymbolSpecCache()
+    
+    results = run_concurrently(lambda: specs.get('XAUUSD'), callers=16)
+    assert all(spec.symbol == 'XAUUSD' for spec in results)
+    assert fake.calls == {'symbol_select': 1, 'symbol_info': 1}
+    
+    # Unknown symbols are looked up every time but never kept
+    assert specs.get('NOPE') is None
+    assert specs.get('NOPE') is None
+    assert fake.calls['symbol_select'] == 3
+    assert ('NOPE',) not in specs._specs._snapshots
@@ -0,0 +1,18 @@
+import app
+from fake_mt5 import FakeMetaTrader5
+
+def make_catalog():
+    catalog = app.SymbolCatalog()
+    catalog._build(FakeMetaTrader5(symbol_count=500, latency_ms=0, seed=2).symbols_get())
+    return catalog
+
+def test_with_prefix_matches_a_scan_of_all_names():
+    catalog = make_catalog()
+    names = catalog.names()
+    for prefix in ('xau', 'SYM01', 'SYM0499', 'EUR', 'ZZZ', ''):
+        expected = sorted(n for n in names if n.upper().startswith(prefix.upper()))
+        assert sorted(catalog.with_prefix(prefix)) == expected
+
+def test_with_prefix_stops_at_limit():
+    catalog = make_catalog()
+    assert catalog.with_prefix('SYM', limit=5) == ['SYM0000', 'SYM0001', 'SYM0002', 'SYM0003', 'SYM0004']
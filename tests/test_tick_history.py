@@ -0,0 +1,82 @@
+import math
+import random
+
+import pytest
+
+import app
+
+def direct_indicators(ticks, window, ema_period):
+    """Indicators recomputed from scratch over the last `window` ticks"""
+    mids = [(bid + ask) / 2 for _, bid, ask, _ in ticks]
+    returns = [0.0] + [math.log(b / a) for a, b in zip(mids, mids[1:])]
+    last = slice(-window, None)
+    
+    mid_w, ret_w = mids[last], returns[last]
+    spread_w = [ask - bid for _, bid, ask, _ in ticks[last]]
+    volume_w = [volume if volume > 0 else 1.0 for *_, volume in ticks[last]]
+    n = len(mid_w)
+    
+    ema = mids[0]
+    alpha = 2.0 / (ema_period + 1)
+    for mid in mids[1:]:
+        ema += alpha * (mid - ema)
+    
+    def std(values):
+        mean = sum(values) / len(values)
+        return math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+    
+    return {
+        'last_price': mids[-1],
+        'sma': sum(mid_w) / n,
+        'ema': ema,
+        'vwap': sum(m * v for m, v in zip(mid_w, volume_w)) / sum(volume_w),
+        'spread_mean': sum(spread_w) / n,
+        'spread_std': std(spread_w),
+        'volatility': std(ret_w)
+    }
+
+def random_ticks(count, seed=3):
+    rng = random.Random(seed)
+    mid = 2350.0
+    ticks = []
+    for i in range(count):
+        mid *= math.exp(rng.gauss(0, 0.0005))
+        spread = rng.uniform(0.1, 0.5)
+        ticks.append((1_750_000_000_000 + i * 250, mid - spread / 2, mid + spread / 2, rng.choice([0, 1, 5, 20])))
+    return ticks
+
+@pytest.mark.parametrize('count', [1, 5, 20, 64, 333])
+def test_indicators_match_direct_recomputation(monkeypatch, count):
+    # Resync often so the test crosses several full recomputations of the sums
+    monkeypatch.setattr(app, 'INDICATOR_RESYNC_INTERVAL', 7)
+    history = app.TickHistory(capacity=64, window=20, ema_period=10)
+    ticks = random_ticks(count)
+    for tick in ticks:
+        history.append(*tick)
+    
+    result = history.indicators()
+    assert result['count'] == min(count, 64)
+    expected = direct_indicators(ticks, window=20, ema_period=10)
+    for name, value in expected.items():
+        assert result[name] == pytest.approx(value, rel=1e-9, abs=1e-12), name
+
+def test_recent_returns_last_points_oldest_first():
+    history = app.TickHistory(capacity=8, window=4)
+    ticks = random_ticks(13)
+    for tick in ticks:
+        history.append(*tick)
+    
+    times, prices = history.recent(5)
+    assert times == [t for t, *_ in ticks[-5:]]
+    assert prices == pytest.approx([(bid + ask) / 2 for _, bid, ask, _ in ticks[-5:]])
+    # Never more than the buffer holds
+    assert len(history.recent(100)[0]) == 8
+
+def test_empty_history():
+    history = app.TickHistory(capacity=8, window=4)
+    assert history.indicators() == {'count': 0, 'window': 4}
+    assert history.recent(3) == ([], [])
+
+def test_window_must_fit_capacity():
+    with pytest.raises(ValueError):
+        app.TickHistory(capacity=4, window=5)